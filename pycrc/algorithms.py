@@ -43,15 +43,140 @@ This is an example use of the different algorithms:
     print("{0:#x}".format(crc.bit_by_bit("123456789")))
     print("{0:#x}".format(crc.bit_by_bit_fast("123456789")))
     print("{0:#x}".format(crc.table_driven("123456789")))
+
+The CRC of a stream of data can be calculated incrementally with an interface
+similar to the one of hashlib:
+
+    from pycrc.algorithms import new
+
+    crc = new('crc-32')
+    crc.update(b"1234")
+    crc.update(b"56789")
+    print(crc.hexdigest())
+
+The CRC of a message can be computed from the CRCs of its parts:
+
+    crc_ab = crc.combine(crc.table_driven(a), crc.table_driven(b), len(b))
+
+If the polynomial and the reflection are known, the unknown xor_in and
+xor_out values can be calculated from a few messages of different lengths and
+their CRCs:
+
+    from pycrc.algorithms import solve_xor
+
+    print(solve_xor(32, 0x04c11db7, True, True,
+            [(b"123456789", 0xcbf43926), (b"pycrc", 0xaae4a62b)]))
+
+The tables used by the table-driven algorithm are built only once per Crc
+instance and are shared between instances with the same parameters through a
+process-wide LRU cache.  The size of this cache can be changed with:
+
+    import pycrc.algorithms
+    pycrc.algorithms.set_table_cache_size(64)
 """
 
+import binascii
+from collections import OrderedDict
+import struct
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+from pycrc.models import CrcModels
+import pycrc.tablestore as tablestore
+
+
+class _LruCache(object):
+    """
+    A simple size-bounded mapping which evicts the least recently used entry.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+
+    def get(self, key):
+        """
+        Return the value for key, or None if the key is not in the cache.
+        """
+        try:
+            value = self.data.pop(key)
+        except KeyError:
+            return None
+        self.data[key] = value
+        return value
+
+    def put(self, key, value):
+        """
+        Insert a value into the cache and evict the oldest entries if needed.
+        """
+        self.data.pop(key, None)
+        self.data[key] = value
+        self.shrink()
+
+    def shrink(self):
+        """
+        Evict the least recently used entries until the cache fits in maxsize.
+        """
+        while len(self.data) > max(self.maxsize, 0):
+            self.data.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all entries from the cache.
+        """
+        self.data.clear()
+
+
+_table_cache = _LruCache(32)
+
+
+def set_table_cache_size(size):
+    """
+    Set the maximum number of CRC tables kept in the process-wide table cache.
+    A size of 0 disables the cache.
+    """
+    _table_cache.maxsize = size
+    _table_cache.shrink()
+
+
+def clear_table_cache():
+    """
+    Remove all tables from the process-wide table cache.
+    """
+    _table_cache.clear()
+
+
+def _reflect_octet(octet):
+    """
+    Return the octet with the order of its 8 bits reversed.
+    """
+    res = 0
+    for i in range(8):
+        res = (res << 1) | ((octet >> i) & 0x01)
+    return res
+
+
+_reflect_octet_table = tuple(_reflect_octet(i) for i in range(256))
+_reflect_octet_translation = bytes(bytearray(_reflect_octet_table))
+
+
+def reflect_octets(in_data):
+    """
+    Return a bytearray with the bit order of every octet of in_data reversed.
+    The whole buffer is translated in a single call to bytearray.translate().
+    """
+    return bytearray(in_data).translate(_reflect_octet_translation)
+
+
 class Crc(object):
     """
     A base class for CRC routines.
     """
     # pylint: disable=too-many-instance-attributes
 
-    def __init__(self, width, poly, reflect_in, xor_in, reflect_out, xor_out, table_idx_width=None, slice_by=1):
+    def __init__(self, width, poly, reflect_in, xor_in, reflect_out, xor_out, table_idx_width=None, slice_by=1,
+                 backend=None):
         """The Crc constructor.
 
         The parameters are as follows:
@@ -61,6 +186,16 @@ class Crc(object):
             xor_in
             reflect_out
             xor_out
+            table_idx_width the number of bits used to index the CRC table.
+                            The table_driven algorithm handles 8 and 16; the
+                            default is 8.  A 16-bit index is slower than
+                            slice_by 8 with CPython (see pycrc.benchmark).
+            slice_by        the number of octets processed at a time by the
+                            table_driven algorithm, one of 1, 4, 8 or 16.
+                            8 is the fastest for long messages with CPython;
+                            16 is not faster (see pycrc.benchmark).
+            backend         the implementation of the table-driven algorithm
+                            used by the CrcHash objects, see get_backend().
         """
         # pylint: disable=too-many-arguments
 
@@ -72,6 +207,10 @@ class Crc(object):
         self.xor_out = xor_out
         self.tbl_idx_width = table_idx_width
         self.slice_by = slice_by
+        if backend not in _backend_names:
+            raise ValueError("unsupported backend {0}".format(backend))
+        self.backend = backend
+        self._backend = None
 
         self.msb_mask = 0x1 << (self.width - 1)
         self.mask = ((self.msb_mask - 1) << 1) | 1
@@ -81,6 +220,10 @@ class Crc(object):
             self.tbl_idx_width = 8
             self.tbl_width = 1 << self.tbl_idx_width
 
+        # The tables used by this object, indexed by table_idx_width and
+        # slice_by, together with the parameters they were built for.
+        self._tbls = {}
+
         self.direct_init = self.xor_in
         self.nondirect_init = self.__get_nondirect_init(self.xor_in)
         if self.width < 8:
@@ -107,14 +250,16 @@ class Crc(object):
     def reflect(self, data, width):
         """
         reflect a data word, i.e. reverts the bit order.
+        The word is reflected one octet at a time with a lookup table.
         """
         # pylint: disable=no-self-use
 
-        res = data & 0x01
-        for dummy_i in range(width - 1):
-            data >>= 1
-            res = (res << 1) | (data & 0x01)
-        return res
+        num_octets = (width + 7) // 8
+        res = 0
+        for dummy_i in range(num_octets):
+            res = (res << 8) | _reflect_octet_table[data & 0xff]
+            data >>= 8
+        return res >> (8 * num_octets - width)
 
 
     def bit_by_bit(self, in_data):
@@ -127,10 +272,11 @@ class Crc(object):
         if isinstance(in_data, str):
             in_data = bytearray(in_data, 'utf-8')
 
+        if self.reflect_in:
+            in_data = reflect_octets(in_data)
+
         reg = self.nondirect_init
         for octet in in_data:
-            if self.reflect_in:
-                octet = self.reflect(octet, 8)
             for i in range(8):
                 topbit = reg & self.msb_mask
                 reg = ((reg << 1) & self.mask) | ((octet >> (7 - i)) & 0x01)
@@ -158,10 +304,11 @@ class Crc(object):
         if isinstance(in_data, str):
             in_data = bytearray(in_data, 'utf-8')
 
+        if self.reflect_in:
+            in_data = reflect_octets(in_data)
+
         reg = self.direct_init
         for octet in in_data:
-            if self.reflect_in:
-                octet = self.reflect(octet, 8)
             for i in range(8):
                 topbit = reg & self.msb_mask
                 if octet & (0x80 >> i):
@@ -177,19 +324,74 @@ class Crc(object):
 
     def gen_table(self):
         """
-        This function generates the CRC table used for the table_driven CRC
+        This function returns the CRC table used for the table_driven CRC
         algorithm.  The Python version cannot handle tables of an index width
-        other than 8.  See the generated C code for tables with different sizes
-        instead.
+        other than 8 or 16.  See the generated C code for tables with different
+        sizes instead.  A table with an index width of 16 has 65536 entries and
+        is never sliced.
+
+        The table is generated on the first call and shared with all other Crc
+        objects with the same width, poly, reflect_in, table_idx_width and
+        slice_by parameters.  The returned table must not be modified.
+        """
+        return self.__get_own_table(self.tbl_idx_width, self.slice_by)
+
+
+    def __get_own_table(self, tbl_idx_width, slice_by):
+        """
+        Return the CRC table(s) for the given index width and slice-by
+        parameter which are kept on this Crc object.  The table cache is only
+        consulted on the first call and after a parameter has been changed.
+        """
+        key = (self.width, self.poly, self.reflect_in)
+        entry = self._tbls.get((tbl_idx_width, slice_by))
+        if entry is None or entry[0] != key:
+            entry = (key, self.__get_table(tbl_idx_width, slice_by))
+            self._tbls[(tbl_idx_width, slice_by)] = entry
+        return entry[1]
+
+
+    def __get_table(self, tbl_idx_width, slice_by):
+        """
+        Return the CRC table(s) for the given index width and slice-by
+        parameter from the table cache or from the persistent table store
+        (see pycrc.tablestore), building them if necessary.
+        """
+        if tbl_idx_width == 16:
+            slice_by = 1
+        key = (self.width, self.poly, self.reflect_in, tbl_idx_width, slice_by)
+        tbl = _table_cache.get(key)
+        if tbl is None:
+            tbl = tablestore.load(self.width, self.poly, self.reflect_in, tbl_idx_width, slice_by)
+            if tbl is None:
+                tbl = self.__build_table(tbl_idx_width, slice_by)
+                tablestore.save(self.width, self.poly, self.reflect_in, tbl_idx_width, tbl)
+            _table_cache.put(key, tbl)
+        return tbl
+
+
+    def __build_table(self, tbl_idx_width, slice_by):
         """
-        table_length = 1 << self.tbl_idx_width
-        tbl = [[0 for i in range(table_length)] for j in range(self.slice_by)]
+        Build the CRC table(s) for the given index width and slice-by
+        parameter.
+        """
+        if tbl_idx_width == 16:
+            # The entry for the octets (hi, lo) is the CRC of the first octet
+            # followed by a zero octet, xor-ed with the CRC of the second one.
+            tbl0, tbl1 = self.__get_table(8, 2)
+            if self.reflect_in:
+                return (tuple(lo ^ hi for hi in tbl0 for lo in tbl1),)
+            else:
+                return (tuple(hi ^ lo for hi in tbl1 for lo in tbl0),)
+
+        table_length = 1 << tbl_idx_width
+        tbl = [[0 for i in range(table_length)] for j in range(slice_by)]
         for i in range(table_length):
             reg = i
             if self.reflect_in:
-                reg = self.reflect(reg, self.tbl_idx_width)
-            reg = reg << (self.width - self.tbl_idx_width + self.crc_shift)
-            for dummy_j in range(self.tbl_idx_width):
+                reg = self.reflect(reg, tbl_idx_width)
+            reg = reg << (self.width - tbl_idx_width + self.crc_shift)
+            for dummy_j in range(tbl_idx_width):
                 if reg & (self.msb_mask << self.crc_shift) != 0:
                     reg = (reg << 1) ^ (self.poly << self.crc_shift)
                 else:
@@ -198,38 +400,689 @@ class Crc(object):
                 reg = self.reflect(reg >> self.crc_shift, self.width) << self.crc_shift
             tbl[0][i] = (reg >> self.crc_shift) & self.mask
 
-        for j in range(1, self.slice_by):
+        # Table j holds the CRC of the octet i followed by j zero octets.
+        for j in range(1, slice_by):
             for i in range(table_length):
-                tbl[j][i] = (tbl[j - 1][i] >> 8) ^ tbl[0][tbl[j - 1][i] & 0xff]
-        return tbl
+                if self.reflect_in:
+                    tbl[j][i] = (tbl[j - 1][i] >> 8) ^ tbl[0][tbl[j - 1][i] & 0xff]
+                else:
+                    tbl[j][i] = ((tbl[j - 1][i] << 8) & self.mask) ^ \
+                            tbl[0][((tbl[j - 1][i] << 8) >> self.width) & 0xff]
+        return tuple(tuple(t) for t in tbl)
 
 
     def table_driven(self, in_data):
         """
         The Standard table_driven CRC algorithm.
+        If the Crc object was created with a slice_by parameter of 4, 8 or 16,
+        the input is processed slice_by octets at a time.  With a
+        table_idx_width of 16 the input is processed two octets at a time.
         """
-        # pylint: disable = line-too-long
-
         # If the input data is a string, convert to bytes.
         if isinstance(in_data, str):
             in_data = bytearray(in_data, 'utf-8')
 
-        tbl = self.gen_table()
+        reg = self._table_update(self._table_init(), in_data)
+        return self._table_finalize(reg)
+
+
+    def _table_init(self):
+        """
+        Return the initial register value of the table-driven algorithm.
+        """
+        if not self.reflect_in:
+            return self.direct_init << self.crc_shift
+        else:
+            return self.reflect(self.direct_init, self.width)
+
+
+    def _table_update(self, reg, in_data):
+        """
+        Feed the bytes in in_data into the register of the table-driven
+        algorithm and return the updated register.
+        """
+        if isinstance(in_data, (bytes, bytearray, memoryview)):
+            if self.tbl_idx_width == 16:
+                tbl = self.__get_own_table(16, 1)[0]
+                end = len(in_data) & ~1
+                if not self.reflect_in:
+                    reg = _table_idx_16_nonreflected(tbl, self.width, self.mask,
+                            reg >> self.crc_shift, in_data, end) << self.crc_shift
+                else:
+                    reg = _table_idx_16_reflected(tbl, self.width, self.mask, reg, in_data, end)
+                in_data = in_data[end:]
+            elif self.slice_by in _slice_by_functions and self.tbl_idx_width == 8 and self.width >= 8:
+                tbl = self.gen_table()
+                slice_by_update = _slice_by_functions[self.slice_by][self.reflect_in]
+                end = len(in_data) - len(in_data) % self.slice_by
+                reg = slice_by_update(tbl, self.width, self.mask, reg, in_data, end)
+                in_data = in_data[end:]
+        if isinstance(in_data, (str, memoryview)):
+            # Python 2 iterates over these as one-character strings.
+            in_data = bytearray(in_data)
+        tbl = self.__get_own_table(8, 1)[0]
 
         if not self.reflect_in:
-            reg = self.direct_init << self.crc_shift
+            idx_shift = self.width - 8 + self.crc_shift
+            reg_shift = 8 - self.crc_shift
+            tbl_shift = self.crc_shift
+            mask = self.mask << self.crc_shift
             for octet in in_data:
-                tblidx = ((reg >> (self.width - self.tbl_idx_width + self.crc_shift)) ^ octet) & 0xff
-                reg = ((reg << (self.tbl_idx_width - self.crc_shift)) ^ (tbl[0][tblidx] << self.crc_shift)) & (self.mask << self.crc_shift)
-            reg = reg >> self.crc_shift
+                tblidx = ((reg >> idx_shift) ^ octet) & 0xff
+                reg = ((reg << reg_shift) ^ (tbl[tblidx] << tbl_shift)) & mask
         else:
-            reg = self.reflect(self.direct_init, self.width)
+            reg_shift = 8
+            mask = self.mask
             for octet in in_data:
                 tblidx = (reg ^ octet) & 0xff
-                reg = ((reg >> self.tbl_idx_width) ^ tbl[0][tblidx]) & self.mask
+                reg = ((reg >> reg_shift) ^ tbl[tblidx]) & mask
+        return reg
+
+
+    def _table_finalize(self, reg):
+        """
+        Return the final CRC value from the register of the table-driven
+        algorithm.
+        """
+        if not self.reflect_in:
+            reg = reg >> self.crc_shift
+        else:
             reg = self.reflect(reg, self.width) & self.mask
 
         if self.reflect_out:
             reg = self.reflect(reg, self.width)
         return reg ^ self.xor_out
 
+
+    def table_driven_batch(self, messages):
+        """
+        Calculate the CRC of many independent messages with the table_driven
+        algorithm.
+
+        messages is either a 2-D array of uint8 with one message per row, or a
+        sequence of strings or bytes-like objects of possibly different
+        lengths.  If NumPy is available and the width is not greater than 64,
+        the messages are processed as lanes of a 2-D array (grouped by their
+        length) and a NumPy array of uint64 is returned.  Otherwise the CRC of
+        each message is calculated with table_driven() and a list is returned.
+        """
+        if _np is None or self.width > 64:
+            return [self.table_driven(bytearray(m) if not isinstance(m, str) else m) for m in messages]
+
+        if isinstance(messages, _np.ndarray) and messages.ndim == 2:
+            return self.__table_driven_lanes(messages.astype(_np.uint8, copy=False))
+
+        messages = [bytearray(m, 'utf-8') if isinstance(m, str) else bytes(bytearray(m)) for m in messages]
+        lengths = OrderedDict()
+        for i, msg in enumerate(messages):
+            lengths.setdefault(len(msg), []).append(i)
+        result = _np.empty(len(messages), dtype=_np.uint64)
+        for length, indices in lengths.items():
+            lanes = _np.frombuffer(b''.join(bytes(messages[i]) for i in indices), dtype=_np.uint8)
+            result[indices] = self.__table_driven_lanes(lanes.reshape(len(indices), length))
+        return result
+
+
+    def __table_driven_lanes(self, lanes):
+        """
+        Run the table_driven algorithm over the rows of the 2-D uint8 array
+        lanes, one byte position of all rows at a time.
+        """
+        uint64 = _np.uint64
+        tbl = _np.array(self.__get_own_table(8, 1)[0], dtype=uint64)
+        columns = _np.ascontiguousarray(lanes.T)
+        reg = _np.full(lanes.shape[0], self._table_init(), dtype=uint64)
+
+        if not self.reflect_in:
+            idx_shift = uint64(self.width - 8 + self.crc_shift)
+            reg_shift = uint64(8 - self.crc_shift)
+            tbl = tbl << uint64(self.crc_shift)
+            mask = uint64(self.mask << self.crc_shift)
+            byte_mask = uint64(0xff)
+            for column in columns:
+                tblidx = ((reg >> idx_shift) ^ column) & byte_mask
+                reg = ((reg << reg_shift) ^ tbl[tblidx]) & mask
+            reg = reg >> uint64(self.crc_shift)
+        else:
+            reg_shift = uint64(8)
+            byte_mask = uint64(0xff)
+            for column in columns:
+                tblidx = (reg ^ column) & byte_mask
+                reg = (reg >> reg_shift) ^ tbl[tblidx]
+
+        if self.reflect_in != self.reflect_out:
+            # reverse the bits of every byte, then the order of the bytes.
+            reflect_tbl = _np.array(_reflect_octet_table, dtype=_np.uint8)
+            octets = reflect_tbl[reg.astype('<u8').view(_np.uint8).reshape(-1, 8)][:, ::-1]
+            reg = _np.ascontiguousarray(octets).view('<u8').reshape(-1).astype(uint64)
+            reg = reg >> uint64(64 - self.width)
+        return reg ^ uint64(self.xor_out)
+
+
+    def extend_zeros(self, crc, length):
+        """
+        Return the CRC of a message followed by length zero octets, given the
+        CRC crc of the message alone.  This takes O(log(length)) time.
+        """
+        reg = self.__crc_to_register(crc)
+        reg = _gf2_shift_zeros(self.width, self.poly, reg, length)
+        return self.__register_to_crc(reg)
+
+
+    def combine(self, crc_a, crc_b, len_b):
+        """
+        Return the CRC of the concatenation of two messages A and B, given
+        the CRC crc_a of A, the CRC crc_b of B and the length len_b of B in
+        octets.  This takes O(log(len_b)) time.
+        """
+        reg_a = self.__crc_to_register(crc_a)
+        reg_b = self.__crc_to_register(crc_b)
+        reg = _gf2_shift_zeros(self.width, self.poly, reg_a ^ self.direct_init, len_b) ^ reg_b
+        return self.__register_to_crc(reg)
+
+
+    def __crc_to_register(self, crc):
+        """
+        Return the register of the bit_by_bit_fast algorithm for a final CRC
+        value.
+        """
+        reg = (crc ^ self.xor_out) & self.mask
+        if self.reflect_out:
+            reg = self.reflect(reg, self.width)
+        return reg
+
+
+    def __register_to_crc(self, reg):
+        """
+        Return the final CRC value for a register of the bit_by_bit_fast
+        algorithm.
+        """
+        if self.reflect_out:
+            reg = self.reflect(reg, self.width)
+        return (reg ^ self.xor_out) & self.mask
+
+
+    def get_backend(self):
+        """
+        Return the backend which implements the table-driven algorithm for the
+        CrcHash objects of this Crc object.
+
+        The backend is selected on the first call according to the backend
+        parameter of the constructor:
+            None                the CRC routines of the binascii module if they
+                                implement the width and the polynomial (see
+                                BinasciiBackend), 'python' otherwise.
+            'python'            the pure Python table-driven algorithm.
+            'native'            the C code generated by pycrc, compiled and
+                                loaded with ctypes (see pycrc.native).  Falls
+                                back to None if the code cannot be compiled.
+        """
+        if self._backend is None:
+            backend = None
+            if self.backend == 'native':
+                # imported here, as the code generator depends on this module.
+                from pycrc import native
+                backend = native.load(self)
+            if backend is None and self.backend != 'python' and \
+                    (self.width, self.poly) in _binascii_params:
+                backend = BinasciiBackend(self)
+            if backend is None:
+                backend = PythonBackend(self)
+            self._backend = backend
+        return self._backend
+
+
+    def new(self, in_data=None):
+        """
+        Return a new CrcHash object for this set of parameters, optionally
+        initialised with in_data.
+        """
+        return CrcHash(self, in_data)
+
+
+class PythonBackend(object):
+    """
+    The pure Python table-driven algorithm of a Crc object, as used by the
+    CrcHash objects.  The register value is opaque to the caller.
+    """
+    name = 'python'
+
+    def __init__(self, crc):
+        self.crc = crc
+
+    def init(self):
+        """
+        Return the initial register value.
+        """
+        return self.crc._table_init()
+
+    def update(self, reg, in_data):
+        """
+        Feed the bytes in in_data into the register and return the updated
+        register.
+        """
+        return self.crc._table_update(reg, in_data)
+
+    def finalize(self, reg):
+        """
+        Return the final CRC value from the register.
+        """
+        return self.crc._table_finalize(reg)
+
+
+class BinasciiBackend(object):
+    """
+    The CRC routines of the binascii module, as used by the CrcHash objects.
+    They implement the following polynomials for any value of xor_in, xor_out,
+    reflect_in and reflect_out:
+        binascii.crc32      width 32, poly 0x04c11db7 (reflected register)
+        binascii.crc_hqx    width 16, poly 0x1021 (non-reflected register)
+    The input octets are reflected with reflect_octets() if reflect_in differs
+    from the direction of the routine.
+    """
+    name = 'binascii'
+
+    def __init__(self, crc):
+        self.crc = crc
+        self._reflected = crc.width == 32
+        self._reflect_octets = crc.reflect_in != self._reflected
+
+    def init(self):
+        """
+        Return the initial register value.
+        """
+        if self._reflected:
+            # binascii.crc32 inverts the register before and after the update.
+            return self.crc.reflect(self.crc.direct_init, 32) ^ 0xffffffff
+        return self.crc.direct_init
+
+    def update(self, reg, in_data):
+        """
+        Feed the bytes in in_data into the register and return the updated
+        register.
+        """
+        if self._reflect_octets:
+            in_data = reflect_octets(in_data)
+        elif not isinstance(in_data, (bytes, bytearray, memoryview)):
+            in_data = bytearray(in_data)
+        if self._reflected:
+            return binascii.crc32(in_data, reg) & 0xffffffff
+        return binascii.crc_hqx(in_data, reg)
+
+    def finalize(self, reg):
+        """
+        Return the final CRC value from the register.
+        """
+        if self._reflected:
+            reg ^= 0xffffffff
+            if not self.crc.reflect_out:
+                reg = self.crc.reflect(reg, 32)
+        elif self.crc.reflect_out:
+            reg = self.crc.reflect(reg, 16)
+        return reg ^ self.crc.xor_out
+
+
+_binascii_params = set([(32, 0x04c11db7), (16, 0x1021)])
+
+_backend_names = (None, 'python', 'native')
+
+
+class CrcHash(object):
+    """
+    An incremental CRC calculator with an interface similar to the hash
+    objects of the hashlib module.
+    """
+
+    def __init__(self, crc, in_data=None, name=None):
+        """
+        The CrcHash constructor.
+
+        crc is the Crc object which defines the parameters of the algorithm.
+        """
+        self.crc = crc
+        self.name = name if name is not None else 'crc-{0:d}'.format(crc.width)
+        self.digest_size = (crc.width + 7) // 8
+        self.block_size = 1
+        self._backend = crc.get_backend()
+        self._reg = self._backend.init()
+        if in_data is not None:
+            self.update(in_data)
+
+    def update(self, in_data):
+        """
+        Update the CRC with the bytes in in_data.
+        """
+        # If the input data is a string, convert to bytes.
+        if isinstance(in_data, str):
+            in_data = bytearray(in_data, 'utf-8')
+        self._reg = self._backend.update(self._reg, in_data)
+
+    def intdigest(self):
+        """
+        Return the CRC of the data passed so far as an integer.
+        """
+        return self._backend.finalize(self._reg)
+
+    def digest(self):
+        """
+        Return the CRC of the data passed so far as a big-endian byte string
+        of digest_size bytes.
+        """
+        value = self.intdigest()
+        out = bytearray(self.digest_size)
+        for i in range(self.digest_size):
+            out[self.digest_size - 1 - i] = (value >> (8 * i)) & 0xff
+        return bytes(out)
+
+    def hexdigest(self):
+        """
+        Return the CRC of the data passed so far as a string of hexadecimal
+        digits.
+        """
+        return '{0:0{1:d}x}'.format(self.intdigest(), 2 * self.digest_size)
+
+    def copy(self):
+        """
+        Return a copy of this object.  The copy shares the table with the
+        original object, so this operation is cheap.
+        """
+        other = CrcHash.__new__(CrcHash)
+        other.__dict__.update(self.__dict__)
+        return other
+
+
+def _gf2_matrix_times(mat, vec):
+    """
+    Multiply the GF(2) matrix mat, given as a list of columns, with the
+    vector vec.
+    """
+    res = 0
+    i = 0
+    while vec:
+        if vec & 1:
+            res ^= mat[i]
+        vec >>= 1
+        i += 1
+    return res
+
+
+def _gf2_matrix_square(mat):
+    """
+    Return the square of the GF(2) matrix mat.
+    """
+    return [_gf2_matrix_times(mat, col) for col in mat]
+
+
+_operator_cache = _LruCache(16)
+
+
+def set_operator_cache_size(size):
+    """
+    Set the maximum number of parameter sets for which the operator matrices
+    used by Crc.combine() and Crc.extend_zeros() are kept in memory.
+    """
+    _operator_cache.maxsize = size
+    _operator_cache.shrink()
+
+
+def _gf2_zeros_operators(width, poly, count):
+    """
+    Return a list of at least count GF(2) matrices, where the k-th matrix
+    feeds 2^k zero octets into the register of the bit_by_bit_fast algorithm.
+    """
+    key = (width, poly)
+    operators = _operator_cache.get(key)
+    if operators is None:
+        # The operator for one zero bit: shift left and xor the polynomial
+        # if the top bit was set.
+        mat = [1 << (i + 1) for i in range(width - 1)] + [poly]
+        for dummy_i in range(3):
+            mat = _gf2_matrix_square(mat)
+        operators = [mat]
+        _operator_cache.put(key, operators)
+    while len(operators) < count:
+        operators.append(_gf2_matrix_square(operators[-1]))
+    return operators
+
+
+def _gf2_shift_zeros(width, poly, reg, length):
+    """
+    Feed length zero octets into the register reg of the bit_by_bit_fast
+    algorithm.
+    """
+    if length < 0:
+        raise ValueError("negative length {0:d}".format(length))
+    operators = _gf2_zeros_operators(width, poly, length.bit_length())
+    k = 0
+    while length:
+        if length & 1:
+            reg = _gf2_matrix_times(operators[k], reg)
+        length >>= 1
+        k += 1
+    return reg
+
+
+def _gf2_solve(rows, num_vars, max_solutions):
+    """
+    Return all solutions of the linear system over GF(2) given by rows, as
+    list of integers with one bit per variable.  Each row is an integer, bit
+    j is the coefficient of variable j and bit num_vars is the right hand
+    side.  Raise ValueError if there are more than max_solutions.
+    """
+    pivots = []
+    rows = list(rows)
+    for col in range(num_vars):
+        for i in range(len(pivots), len(rows)):
+            if rows[i] >> col & 1:
+                break
+        else:
+            continue
+        row = len(pivots)
+        rows[row], rows[i] = rows[i], rows[row]
+        for j in range(len(rows)):
+            if j != row and rows[j] >> col & 1:
+                rows[j] ^= rows[row]
+        pivots.append(col)
+    for row in rows[len(pivots):]:
+        if row >> num_vars & 1:
+            return []
+
+    free_vars = [col for col in range(num_vars) if col not in set(pivots)]
+    if 1 << len(free_vars) > max_solutions:
+        raise ValueError("{0:d} unknown bits cannot be determined; "
+                         "add samples of different lengths".format(len(free_vars)))
+    solutions = []
+    for assignment in range(1 << len(free_vars)):
+        solution = 0
+        for i, col in enumerate(free_vars):
+            if assignment >> i & 1:
+                solution |= 1 << col
+        for row, col in zip(rows, pivots):
+            value = row >> num_vars & 1
+            for free_col in free_vars:
+                value ^= (row >> free_col) & (solution >> free_col) & 1
+            solution |= value << col
+        solutions.append(solution)
+    return solutions
+
+
+def solve_xor(width, poly, reflect_in, reflect_out, samples, max_solutions=256):
+    """
+    Return the sorted list of all (xor_in, xor_out) pairs which are
+    consistent with the (message, crc) samples of a CRC with the given width,
+    polynomial and reflection.  Raise ValueError if there are more than
+    max_solutions, which happens if all samples have the same length.
+
+    The register after a message of length L with the initial value xor_in
+    is A_L * xor_in + R(message), where A_L is the operator which appends L
+    zero octets and R(message) is the register for an initial value of 0.
+    With Y = reflect_out ? reflect(xor_out) : xor_out, each sample gives width
+    linear equations in the 2 * width unknown bits of xor_in and Y.
+    """
+    crc0 = Crc(width=width, poly=poly, reflect_in=reflect_in, xor_in=0, reflect_out=False, xor_out=0)
+    mask = crc0.mask
+    rows = []
+    columns = {}
+    for message, crc in samples:
+        length = len(message)
+        if length not in columns:
+            columns[length] = [_gf2_shift_zeros(width, poly, 1 << j, length) for j in range(width)]
+        if reflect_out:
+            crc = crc0.reflect(crc, width)
+        rhs = (crc & mask) ^ crc0.new(message).intdigest()
+        for i in range(width):
+            row = 1 << (width + i) | (rhs >> i & 1) << (2 * width)
+            for j, column in enumerate(columns[length]):
+                row |= (column >> i & 1) << j
+            rows.append(row)
+
+    result = []
+    for solution in _gf2_solve(rows, 2 * width, max_solutions):
+        xor_in = solution & mask
+        xor_out = solution >> width
+        if reflect_out:
+            xor_out = crc0.reflect(xor_out, width)
+        result.append((xor_in, xor_out))
+    return sorted(result)
+
+
+def _slice_by_4_reflected(tbl, dummy_width, mask, reg, in_data, end):
+    """
+    Slice-by-4 update of a reflected register over in_data[0:end].
+    """
+    t0, t1, t2, t3 = tbl
+    unpack_from = _le_u32.unpack_from
+    for pos in range(0, end, 4):
+        reg ^= unpack_from(in_data, pos)[0]
+        reg = (reg >> 32) ^ \
+            t3[reg & 0xff] ^ t2[(reg >> 8) & 0xff] ^ t1[(reg >> 16) & 0xff] ^ t0[(reg >> 24) & 0xff]
+    return reg & mask
+
+
+def _slice_by_8_reflected(tbl, dummy_width, mask, reg, in_data, end):
+    """
+    Slice-by-8 update of a reflected register over in_data[0:end].
+    """
+    t0, t1, t2, t3, t4, t5, t6, t7 = tbl
+    unpack_from = _le_u64.unpack_from
+    for pos in range(0, end, 8):
+        reg ^= unpack_from(in_data, pos)[0]
+        reg = (reg >> 64) ^ \
+            t7[reg & 0xff] ^ t6[(reg >> 8) & 0xff] ^ t5[(reg >> 16) & 0xff] ^ t4[(reg >> 24) & 0xff] ^ \
+            t3[(reg >> 32) & 0xff] ^ t2[(reg >> 40) & 0xff] ^ t1[(reg >> 48) & 0xff] ^ t0[(reg >> 56) & 0xff]
+    return reg & mask
+
+
+def _slice_by_16_reflected(tbl, dummy_width, mask, reg, in_data, end):
+    """
+    Slice-by-16 update of a reflected register over in_data[0:end].
+    """
+    t0, t1, t2, t3, t4, t5, t6, t7, t8, t9, t10, t11, t12, t13, t14, t15 = tbl
+    unpack_from = _le_u64x2.unpack_from
+    for pos in range(0, end, 16):
+        lo, hi = unpack_from(in_data, pos)
+        reg ^= lo | (hi << 64)
+        reg = (reg >> 128) ^ \
+            t15[reg & 0xff] ^ t14[(reg >> 8) & 0xff] ^ t13[(reg >> 16) & 0xff] ^ t12[(reg >> 24) & 0xff] ^ \
+            t11[(reg >> 32) & 0xff] ^ t10[(reg >> 40) & 0xff] ^ t9[(reg >> 48) & 0xff] ^ t8[(reg >> 56) & 0xff] ^ \
+            t7[(reg >> 64) & 0xff] ^ t6[(reg >> 72) & 0xff] ^ t5[(reg >> 80) & 0xff] ^ t4[(reg >> 88) & 0xff] ^ \
+            t3[(reg >> 96) & 0xff] ^ t2[(reg >> 104) & 0xff] ^ t1[(reg >> 112) & 0xff] ^ t0[(reg >> 120) & 0xff]
+    return reg & mask
+
+
+def _slice_by_4_nonreflected(tbl, width, mask, reg, in_data, end):
+    """
+    Slice-by-4 update of a non-reflected register over in_data[0:end].
+    """
+    t0, t1, t2, t3 = tbl
+    unpack_from = _be_u32.unpack_from
+    for pos in range(0, end, 4):
+        reg <<= 32
+        idx = (reg >> width) ^ unpack_from(in_data, pos)[0]
+        reg = (reg & mask) ^ \
+            t3[idx >> 24] ^ t2[(idx >> 16) & 0xff] ^ t1[(idx >> 8) & 0xff] ^ t0[idx & 0xff]
+    return reg
+
+
+def _slice_by_8_nonreflected(tbl, width, mask, reg, in_data, end):
+    """
+    Slice-by-8 update of a non-reflected register over in_data[0:end].
+    """
+    t0, t1, t2, t3, t4, t5, t6, t7 = tbl
+    unpack_from = _be_u64.unpack_from
+    for pos in range(0, end, 8):
+        reg <<= 64
+        idx = (reg >> width) ^ unpack_from(in_data, pos)[0]
+        reg = (reg & mask) ^ \
+            t7[idx >> 56] ^ t6[(idx >> 48) & 0xff] ^ t5[(idx >> 40) & 0xff] ^ t4[(idx >> 32) & 0xff] ^ \
+            t3[(idx >> 24) & 0xff] ^ t2[(idx >> 16) & 0xff] ^ t1[(idx >> 8) & 0xff] ^ t0[idx & 0xff]
+    return reg
+
+
+def _slice_by_16_nonreflected(tbl, width, mask, reg, in_data, end):
+    """
+    Slice-by-16 update of a non-reflected register over in_data[0:end].
+    """
+    t0, t1, t2, t3, t4, t5, t6, t7, t8, t9, t10, t11, t12, t13, t14, t15 = tbl
+    unpack_from = _be_u64x2.unpack_from
+    for pos in range(0, end, 16):
+        hi, lo = unpack_from(in_data, pos)
+        reg <<= 128
+        idx = (reg >> width) ^ (hi << 64) ^ lo
+        reg = (reg & mask) ^ \
+            t15[idx >> 120] ^ t14[(idx >> 112) & 0xff] ^ t13[(idx >> 104) & 0xff] ^ t12[(idx >> 96) & 0xff] ^ \
+            t11[(idx >> 88) & 0xff] ^ t10[(idx >> 80) & 0xff] ^ t9[(idx >> 72) & 0xff] ^ t8[(idx >> 64) & 0xff] ^ \
+            t7[(idx >> 56) & 0xff] ^ t6[(idx >> 48) & 0xff] ^ t5[(idx >> 40) & 0xff] ^ t4[(idx >> 32) & 0xff] ^ \
+            t3[(idx >> 24) & 0xff] ^ t2[(idx >> 16) & 0xff] ^ t1[(idx >> 8) & 0xff] ^ t0[idx & 0xff]
+    return reg
+
+
+def _table_idx_16_reflected(tbl, dummy_width, mask, reg, in_data, end):
+    """
+    Update of a reflected register over in_data[0:end] with a 16-bit table
+    index.
+    """
+    for word in struct.unpack_from('<{0:d}H'.format(end // 2), in_data):
+        reg = (reg >> 16) ^ tbl[(reg ^ word) & 0xffff]
+    return reg & mask
+
+
+def _table_idx_16_nonreflected(tbl, width, mask, reg, in_data, end):
+    """
+    Update of a non-reflected register over in_data[0:end] with a 16-bit
+    table index.
+    """
+    for word in struct.unpack_from('>{0:d}H'.format(end // 2), in_data):
+        reg <<= 16
+        reg = (reg & mask) ^ tbl[(reg >> width) ^ word]
+    return reg
+
+
+_le_u32 = struct.Struct('<I')
+_le_u64 = struct.Struct('<Q')
+_le_u64x2 = struct.Struct('<QQ')
+_be_u32 = struct.Struct('>I')
+_be_u64 = struct.Struct('>Q')
+_be_u64x2 = struct.Struct('>QQ')
+
+# The slice-by update functions, indexed by slice_by and reflect_in.
+_slice_by_functions = {
+    4:  {False: _slice_by_4_nonreflected, True: _slice_by_4_reflected},
+    8:  {False: _slice_by_8_nonreflected, True: _slice_by_8_reflected},
+    16: {False: _slice_by_16_nonreflected, True: _slice_by_16_reflected},
+}
+
+
+def new(model, in_data=None):
+    """
+    Return a new CrcHash object for one of the models known to pycrc (see
+    pycrc.models), optionally initialised with in_data.
+    """
+    params = CrcModels().get_params(model)
+    if params is None:
+        raise ValueError("unsupported model {0:s}".format(model))
+    crc = Crc(
+        width=params['width'], poly=params['poly'],
+        reflect_in=params['reflect_in'], xor_in=params['xor_in'],
+        reflect_out=params['reflect_out'], xor_out=params['xor_out'])
+    return CrcHash(crc, in_data, name=params['name'])
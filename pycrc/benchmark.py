@@ -0,0 +1,275 @@
+#  pycrc -- parameterisable CRC calculation utility and C source code generator
+#
+#  Copyright (c) 2006-2017  Thomas Pircher  <tehpeh-web@tty1.net>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+
+
+"""
+Throughput benchmark of the Python CRC algorithms and backends.
+
+Every algorithm is run over a matrix of models and message sizes.  For each
+combination the throughput (from the median time per call, which is less
+sensitive to interruptions than the mean), the percentiles of the time per
+call and the setup time (table generation or loading, compilation of the
+native backend) are measured:
+
+    import pycrc.benchmark as bm
+
+    report = bm.run(models=['crc-32'], sizes=[16, 4096])
+    print(bm.format_report(report))
+    bm.write_report('benchmark.json', report)
+
+A report can be compared with a baseline report saved by an earlier run:
+
+    for r in bm.compare(bm.read_report('baseline.json'), report):
+        print("{model:s} {algorithm:s} {size:d}: {change:+.1%}".format(**r))
+"""
+
+import json
+import platform
+import timeit
+from pycrc import version
+from pycrc.algorithms import Crc, clear_table_cache
+from pycrc.models import CrcModels
+
+
+default_models = ['crc-16', 'xmodem', 'crc-32', 'crc-32-mpeg', 'crc-64-xz']
+default_sizes = [16, 256, 4 * 1024, 64 * 1024, 1024 * 1024, 16 * 1024 * 1024, 64 * 1024 * 1024]
+all_algorithms = ['bit-by-bit', 'bit-by-bit-fast', 'table-driven', 'table-idx-16', 'slice-by-4',
+                  'slice-by-8', 'slice-by-16', 'binascii', 'native']
+
+_percentiles = (50, 90, 99)
+_max_calls = 100000
+
+
+def _implementation(params, algorithm):
+    """
+    Return a tuple (setup, function) for the algorithm with the given
+    parameters, or None if the algorithm is not available for them.  setup
+    prepares the tables or the backend; function returns the CRC of a
+    message.
+    """
+    kwargs = dict((k, params[k]) for k in ('width', 'poly', 'reflect_in', 'xor_in', 'reflect_out', 'xor_out'))
+    if algorithm == 'bit-by-bit':
+        crc = Crc(**kwargs)
+        return None, crc.bit_by_bit
+    if algorithm == 'bit-by-bit-fast':
+        crc = Crc(**kwargs)
+        return None, crc.bit_by_bit_fast
+    if algorithm in ('table-driven', 'table-idx-16', 'slice-by-4', 'slice-by-8', 'slice-by-16'):
+        if algorithm == 'table-driven':
+            crc = Crc(table_idx_width=8, **kwargs)
+        elif algorithm == 'table-idx-16':
+            crc = Crc(table_idx_width=16, **kwargs)
+        elif params['width'] >= 8:
+            crc = Crc(table_idx_width=8, slice_by=int(algorithm[len('slice-by-'):]), **kwargs)
+        else:
+            return None
+        return crc.gen_table, crc.table_driven
+    if algorithm in ('binascii', 'native'):
+        crc = Crc(backend=None if algorithm == 'binascii' else 'native', **kwargs)
+        if crc.get_backend().name != algorithm:
+            return None
+        return crc.get_backend, lambda in_data: crc.new(in_data).intdigest()
+    raise ValueError("unknown algorithm {0:s}".format(algorithm))
+
+
+def _percentile(sorted_times, percent):
+    """
+    Return the nearest-rank percentile of a sorted list.
+    """
+    rank = (len(sorted_times) * percent + 99) // 100
+    return sorted_times[max(rank, 1) - 1]
+
+
+def _measure(function, in_data, min_time):
+    """
+    Call function(in_data) until min_time seconds have passed, at least once
+    and at most _max_calls times, and return the sorted list of the times per
+    call.
+    """
+    timer = timeit.default_timer
+    times = []
+    total = 0.0
+    while total < min_time and len(times) < _max_calls:
+        start = timer()
+        function(in_data)
+        elapsed = timer() - start
+        times.append(elapsed)
+        total += elapsed
+    return sorted(times)
+
+
+def run(models=None, sizes=None, algorithms=None, params=None, min_time=0.5, max_time=5.0, verbose=False):
+    """
+    Run the benchmark and return the report as a dict.
+
+    models is a list of model names (default: default_models); params is an
+    optional list of additional parameter sets, dicts with the keys of the
+    models in pycrc.models and a name.  sizes is the list of message sizes in
+    octets (default: default_sizes), algorithms a list of names from
+    all_algorithms (default: all).  Algorithms which are not
+    available for a model are left out.
+
+    Each combination is run for at least min_time seconds.  Combinations for
+    which a single call is estimated to take longer than max_time seconds,
+    from the throughput at the previous size, are skipped.
+    """
+    if models is None and params is None:
+        models = default_models
+    if sizes is None:
+        sizes = default_sizes
+    if algorithms is None:
+        algorithms = all_algorithms
+    sizes = sorted(sizes)
+
+    crc_models = CrcModels()
+    all_params = []
+    for name in models or []:
+        model = crc_models.get_params(name)
+        if model is None:
+            raise ValueError("unsupported model {0:s}".format(name))
+        all_params.append(model)
+    all_params += params or []
+
+    pattern = bytes(bytearray(range(256)))
+    data = pattern * (sizes[-1] // len(pattern) + 1)
+
+    results = []
+    for model in all_params:
+        for algorithm in algorithms:
+            clear_table_cache()
+            timer = timeit.default_timer
+            start = timer()
+            impl = _implementation(model, algorithm)
+            if impl is None:
+                continue
+            setup, function = impl
+            if setup is not None:
+                setup()
+            setup_time = timer() - start
+            throughput = None
+            for size in sizes:
+                if throughput is not None and size / throughput > max_time:
+                    break
+                in_data = data[:size]
+                times = _measure(function, in_data, min_time)
+                throughput = size / max(_percentile(times, 50), 1e-9)
+                result = {
+                    'model': model['name'],
+                    'algorithm': algorithm,
+                    'size': size,
+                    'calls': len(times),
+                    'mib_per_s': throughput / (1024 * 1024),
+                    'latency': dict(('p{0:d}'.format(p), _percentile(times, p)) for p in _percentiles),
+                    'setup_time': setup_time,
+                }
+                results.append(result)
+                if verbose:
+                    print(format_result(result))
+    return {
+        'pycrc_version': version,
+        'python': platform.python_implementation() + ' ' + platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+
+def _format_size(size):
+    """
+    Return the size in octets as human readable string.
+    """
+    for unit in ('B', 'KiB', 'MiB'):
+        if size < 1024 or size % 1024 != 0 or unit == 'MiB':
+            return '{0:d} {1:s}'.format(size, unit)
+        size //= 1024
+
+
+def format_result(result):
+    """
+    Return one line of the report, with the latencies in microseconds and the
+    setup time in milliseconds.
+    """
+    latency = result['latency']
+    return '{0:<14s}{1:<17s}{2:>8s}{3:>12.3f}{4:>12.1f}{5:>12.1f}{6:>12.1f}{7:>12.2f}'.format(
+        result['model'], result['algorithm'], _format_size(result['size']), result['mib_per_s'],
+        latency['p50'] * 1e6, latency['p90'] * 1e6, latency['p99'] * 1e6, result['setup_time'] * 1e3)
+
+
+def format_header():
+    """
+    Return the header of the table of results.
+    """
+    return '{0:<14s}{1:<17s}{2:>8s}{3:>12s}{4:>12s}{5:>12s}{6:>12s}{7:>12s}'.format(
+        'model', 'algorithm', 'size', 'MiB/s', 'p50 [us]', 'p90 [us]', 'p99 [us]', 'setup [ms]')
+
+
+def format_report(report):
+    """
+    Return the report as table.
+    """
+    lines = ['{0:s} on {1:s}, pycrc {2:s}'.format(report['python'], report['machine'], report['pycrc_version'])]
+    lines.append(format_header())
+    lines += [format_result(result) for result in report['results']]
+    return '\n'.join(lines)
+
+
+def write_report(filename, report):
+    """
+    Write the report as JSON file.
+    """
+    with open(filename, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def read_report(filename):
+    """
+    Return the report read from a JSON file.
+    """
+    with open(filename) as f:
+        return json.load(f)
+
+
+def compare(baseline, report, threshold=0.1):
+    """
+    Return the list of regressions of the report with respect to the
+    baseline report: the combinations of model, algorithm and size whose
+    throughput dropped by more than threshold (a fraction of the baseline).
+    Each regression is a dict with the keys model, algorithm, size, baseline,
+    current (both in MiB/s) and change (a negative fraction).
+    """
+    baseline_results = dict(((r['model'], r['algorithm'], r['size']), r['mib_per_s']) for r in baseline['results'])
+    regressions = []
+    for result in report['results']:
+        key = (result['model'], result['algorithm'], result['size'])
+        if key not in baseline_results:
+            continue
+        change = result['mib_per_s'] / baseline_results[key] - 1.0
+        if change < -threshold:
+            regressions.append({
+                'model': result['model'],
+                'algorithm': result['algorithm'],
+                'size': result['size'],
+                'baseline': baseline_results[key],
+                'current': result['mib_per_s'],
+                'change': change,
+            })
+    return regressions
@@ -35,6 +35,7 @@ use as follows:
 """
 
 import pycrc.symtable
+from pycrc.models import CrcModels
 import pycrc.expr as expr
 
 
@@ -127,7 +128,11 @@ class ParamBlock(CodeGen):
         The class constructor.
         """
         super(ParamBlock, self).__init__(opt, indent)
+        model_names = CrcModels().names_by_params(
+                opt.width, opt.poly, opt.reflect_in, opt.xor_in, opt.reflect_out, opt.xor_out)
         self.content = [
+                Conditional(opt, '', len(model_names) > 0,
+                    ['- {0:13s} = {1}'.format('Model', model_names[0] if model_names else '')]),
                 '- {0:13s} = {1}'.format('Width', self.sym['crc_width']),
                 '- {0:13s} = {1}'.format('Poly', self.sym['crc_poly']),
                 '- {0:13s} = {1}'.format('XorIn', self.sym['crc_xor_in']),
@@ -138,6 +143,14 @@ class ParamBlock(CodeGen):
                     ['- {0:13s} = {1}'.format('Algorithm', self.sym['crc_algorithm'])]),
                 Conditional(opt, '', opt.slice_by > 1,
                     ['- {0:13s} = {1}'.format('SliceBy', opt.slice_by)]),
+                Conditional(opt, '', opt.streams > 1,
+                    ['- {0:13s} = {1}'.format('Streams', opt.streams)]),
+                Conditional(opt, '', opt.clmul,
+                    ['- {0:13s} = {1}'.format('Folding', 'PCLMULQDQ')]),
+                Conditional(opt, '', _use_crc32_instruction(opt),
+                    ['- {0:13s} = {1}'.format('Hardware', 'SSE4.2 crc32 if supported by the CPU')]),
+                Conditional(opt, '', opt.dispatch,
+                    ['- {0:13s} = {1}'.format('Dispatch', ', '.join(_dispatch_variants(opt)))]),
                 ]
 
 
@@ -360,6 +373,16 @@ class File(CodeGen):
                     '\\return             The updated crc value.',
                     ]),
                 '{0};'.format(_crc_update_function_def(self.opt, self.sym)),
+                Conditional(self.opt, '', self.opt.dispatch, [
+                    '', '',
+                    Comment(self.opt, '', [
+                        'The implementations of {crc_update_function}(), which selects the fastest one'.format(**self.sym),
+                        'for the CPU on its first call.  They take the same parameters as',
+                        '{crc_update_function}() and may be called directly, but the SIMD variants only'.format(**self.sym),
+                        'on CPUs which support their instructions.',
+                        ]),
+                    CodeGen(self.opt, '', _dispatch_declarations(self.opt, self.sym)),
+                    ]),
                 '', '',
                 Comment(self.opt, '', [
                     'Calculate the final crc value.',
@@ -382,6 +405,27 @@ class File(CodeGen):
                     ], [
                     '{0};'.format(_crc_finalize_function_def(self.opt, self.sym)),
                     ]),
+                Conditional(self.opt, '', self.opt.combine, [
+                    '', '',
+                    Comment(self.opt, '', [
+                        'Calculate the final crc value of a message followed by \\a len zero bytes.',
+                        '',
+                        '\\param[in] crc  The final crc value of the message.',
+                        '\\param[in] len  The number of zero bytes.',
+                        '\\return     The final crc value of the message followed by the zero bytes.',
+                        ]),
+                    '{crc_t} {crc_shift_zeros_function}({crc_t} crc, size_t len);'.format(**self.sym),
+                    '', '',
+                    Comment(self.opt, '', [
+                        'Calculate the final crc value of the concatenation of two messages.',
+                        '',
+                        '\\param[in] crc1 The final crc value of the first message.',
+                        '\\param[in] crc2 The final crc value of the second message.',
+                        '\\param[in] len2 The length of the second message in bytes.',
+                        '\\return     The final crc value of the concatenated messages.',
+                        ]),
+                    '{crc_t} {crc_combine_function}({crc_t} crc1, {crc_t} crc2, size_t len2);'.format(**self.sym),
+                    ]),
                 '', '',
                 '#ifdef __cplusplus',
                 '}           /* closing brace for extern "C" */',
@@ -411,6 +455,28 @@ class File(CodeGen):
                 Conditional(self.opt, '', self.opt.slice_by > 1, [
                     '#include <endian.h>',
                     ]),
+                Conditional(self.opt, '', self.opt.clmul, [
+                    CodeGen(self.opt, None, [
+                        '#if defined(__PCLMUL__) && defined(__SSE4_1__)',
+                        '#include <immintrin.h>',
+                        '#endif',
+                        ]),
+                    ]),
+                Conditional2(self.opt, '', self.opt.dispatch, [
+                    CodeGen(self.opt, None, [
+                        '#if defined(__GNUC__) && defined(__x86_64__)',
+                        '#include <immintrin.h>',
+                        '#endif',
+                        ]),
+                    ], [
+                    Conditional(self.opt, '', _use_crc32_instruction(self.opt), [
+                        CodeGen(self.opt, None, [
+                            '#if defined(__GNUC__) && defined(__x86_64__)',
+                            '#include <nmmintrin.h>',
+                            '#endif',
+                            ]),
+                        ]),
+                    ]),
                 Conditional(self.opt, '', _use_reflect_func(self.opt) and _use_static_reflect_func(self.opt), [
                     '',
                     'static {crc_t} {crc_reflect_function}({crc_t} data, size_t data_len);'.format(**self.sym),
@@ -420,8 +486,11 @@ class File(CodeGen):
                 CodeGen(self.opt, '', _crc_reflect_function_gen(self.opt, self.sym)),
                 CodeGen(self.opt, '', _crc_init_function_gen(self.opt, self.sym)),
                 CodeGen(self.opt, '', _crc_table_gen(self.opt, self.sym)),
+                CodeGen(self.opt, '', _crc_stream_shift_gen(self.opt, self.sym)),
+                CodeGen(self.opt, '', _crc32_instruction_function_gen(self.opt, self.sym)),
                 CodeGen(self.opt, '', _crc_update_function_gen(self.opt, self.sym)),
                 CodeGen(self.opt, '', _crc_finalize_function_gen(self.opt, self.sym)),
+                CodeGen(self.opt, '', _crc_combine_function_gen(self.opt, self.sym)),
                 '',
                 ]
         return out
@@ -870,6 +939,15 @@ def _use_static_reflect_func(opt):
         return True
 
 
+def _use_crc32_instruction(opt):
+    """
+    Return True if the update function can use the crc32 instruction of
+    SSE4.2, i.e. for the reflected Castagnoli polynomial of crc-32c.
+    """
+    return opt.algorithm == opt.algo_table_driven and not opt.undefined_crc_parameters and \
+            opt.width == 32 and opt.poly == 0x1edc6f41 and opt.reflect_in and opt.c_std != 'C89'
+
+
 def _use_crc_table_gen(opt):
     """
     Return True if the table generator function is to be generated.
@@ -1163,10 +1241,112 @@ def _crc_init_function_gen(opt, sym):
     return out
 
 
+def _crc32_instruction_function_gen(opt, sym):
+    """
+    Return the code of the update function with the crc32 instruction.
+
+    The latency of the instruction is three cycles, so the message is split
+    into three streams which are calculated independently, the second and
+    the third starting with a zero register.  The registers of the streams
+    are then combined by feeding the length of a stream in zero octets into
+    the previous register with a precalculated table.  Long messages use
+    streams of 8 KiB, the remaining data streams of 256 octets.
+    """
+    if not _use_crc32_instruction(opt):
+        return []
+
+    def streams(length):
+        shift = 'crc32_shift(crc_shift_{0:s}_table, crc0)'.format(length)
+        return [
+                'while (data_len >= 3 * {0:s}) '.format(sym['crc_shift_' + length]) + '{',
+                CodeGen(opt, 4*' ', [
+                    'const uint64_t *d64 = (const uint64_t *)(const void *)d;',
+                    'uint64_t crc1 = 0, crc2 = 0;',
+                    'for (i = 0; i < {0:s} / 8; i++) '.format(sym['crc_shift_' + length]) + '{',
+                    CodeGen(opt, 4*' ', [
+                        'crc0 = _mm_crc32_u64(crc0, d64[i]);',
+                        'crc1 = _mm_crc32_u64(crc1, d64[i + {0:s} / 8]);'.format(sym['crc_shift_' + length]),
+                        'crc2 = _mm_crc32_u64(crc2, d64[i + 2 * {0:s} / 8]);'.format(sym['crc_shift_' + length]),
+                        ]),
+                    '}',
+                    'crc0 = {0:s} ^ crc1;'.format(shift),
+                    'crc0 = {0:s} ^ crc2;'.format(shift),
+                    'd += 3 * {0:s};'.format(sym['crc_shift_' + length]),
+                    'data_len -= 3 * {0:s};'.format(sym['crc_shift_' + length]),
+                    ]),
+                '}',
+                ]
+
+    out = [
+            '', '',
+            CodeGen(opt, None, [
+                '#if defined(__GNUC__) && defined(__x86_64__)',
+                ]),
+            Comment(opt, '', [
+                'Tables which feed {crc_shift_long} and {crc_shift_short} zero octets into the register.'.format(**sym),
+                ]),
+            'static const uint32_t crc_shift_long_table[4][256] = {crc_shift_long_table_init};'.format(**sym),
+            'static const uint32_t crc_shift_short_table[4][256] = {crc_shift_short_table_init};'.format(**sym),
+            '',
+            'static uint64_t crc32_shift(const uint32_t table[4][256], uint64_t crc)',
+            '{',
+            CodeGen(opt, 4*' ', [
+                'return table[0][crc & 0xff] ^ table[1][(crc >> 8) & 0xff] ^',
+                '        table[2][(crc >> 16) & 0xff] ^ table[3][(crc >> 24) & 0xff];',
+                ]),
+            '}',
+            '',
+            Comment(opt, '', [
+                'Update the crc value with new data, using the crc32 instruction of SSE4.2.',
+                ]),
+            '__attribute__((target("sse4.2")))',
+            '{0:s}{crc_t} {crc_update_function}_sse42({crc_t} crc, const void *data, size_t data_len)'.format(
+                '' if opt.dispatch else 'static ', **sym),
+            '{',
+            CodeGen(opt, 4*' ', [
+                'const unsigned char *d = (const unsigned char *)data;',
+                'uint64_t crc0 = crc;',
+                'size_t i;',
+                '',
+                '/* Align to a multiple of 8 bytes */',
+                'while (data_len && (((uintptr_t)(const void *)d) % 8 != 0)) {',
+                CodeGen(opt, 4*' ', [
+                    'crc0 = _mm_crc32_u8((uint32_t)crc0, *d++);',
+                    'data_len--;',
+                    ]),
+                '}',
+                '',
+                ] + streams('long') + streams('short') + [
+                '',
+                '/* Remaining bytes with a single stream */',
+                'while (data_len >= 8) {',
+                CodeGen(opt, 4*' ', [
+                    'crc0 = _mm_crc32_u64(crc0, *(const uint64_t *)(const void *)d);',
+                    'd += 8;',
+                    'data_len -= 8;',
+                    ]),
+                '}',
+                'while (data_len--) {',
+                CodeGen(opt, 4*' ', [
+                    'crc0 = _mm_crc32_u8((uint32_t)crc0, *d++);',
+                    ]),
+                '}',
+                'return ({crc_t})crc0;'.format(**sym),
+                ]),
+            '}',
+            CodeGen(opt, None, [
+                '#endif',
+                ]),
+            ]
+    return out
+
+
 def _crc_update_function_gen(opt, sym):
     """
     Return the code for the update function.
     """
+    if opt.dispatch:
+        return _crc_dispatch_function_gen(opt, sym)
     out = [
             '', '',
             _crc_update_function_def(opt, sym),
@@ -1280,6 +1460,20 @@ def _crc_update_function_gen(opt, sym):
                 CodeGen(opt, 4*' ', [
                     'unsigned int tbl_idx;',
                     '',
+                    Conditional(opt, '', _use_crc32_instruction(opt), [
+                        CodeGen(opt, None, [
+                            '#if defined(__GNUC__) && defined(__x86_64__)',
+                            ]),
+                        'if (__builtin_cpu_supports("sse4.2")) {',
+                        CodeGen(opt, 4*' ', [
+                            'return {crc_update_function}_sse42(crc, data, data_len);'.format(**sym),
+                            ]),
+                        '}',
+                        CodeGen(opt, None, [
+                            '#endif',
+                            ]),
+                        '',
+                        ]),
                     Conditional2(opt, '', opt.reflect_in == None, [
                         'if (cfg->reflect_in) {',
                         CodeGen(opt, 4*' ', [
@@ -1301,24 +1495,8 @@ def _crc_update_function_gen(opt, sym):
                             ]),
                         '}',
                         ], [
-                            Conditional(opt, '', opt.slice_by > 1, [
-                                '/* Align to a multiple of {crc_slice_by} bytes */'.format(**sym),
-                                'while (data_len && (((uintptr_t)(const void *)d) % {crc_slice_by} != 0))'.format(**sym) + ' {',
-                                CodeGen(opt, 4*' ', [
-                                    _crc_table_core_algorithm(opt, sym),
-                                    'data_len--;',
-                                    ]),
-                                '}',
-                                '',
-                                _crc_table_slice_by_algorithm(opt, sym),
-                                '/* Remaining bytes with the standard algorithm */',
-                                'd = (const unsigned char *)d32;',
-                                ]),
-                            'while (data_len--) {',
-                            CodeGen(opt, 4*' ', [
-                                _crc_table_core_algorithm(opt, sym),
-                                ]),
-                            '}',
+                            CodeGen(opt, '', _crc_table_fast_loops(opt, sym)),
+                            _crc_table_byte_loop(opt, sym),
                         ]),
                     'return {0};'.format(expr.And('crc', sym['cfg_mask']).simplify()),
                     ]),
@@ -1330,6 +1508,119 @@ def _crc_update_function_gen(opt, sym):
 
 
 
+def _dispatch_variants(opt):
+    """
+    Return the list of the names of the variants of the dispatch mode, from
+    the slowest to the fastest.
+    """
+    variants = ['table']
+    if opt.slice_by > 1:
+        variants.append('slice_by_{0:d}'.format(opt.slice_by))
+    variants.append('clmul')
+    if _use_crc32_instruction(opt):
+        variants.append('sse42')
+    return variants
+
+
+def _dispatch_declarations(opt, sym):
+    """
+    Return the declarations of the variants of the dispatch mode.
+    """
+    out = []
+    for variant in _dispatch_variants(opt):
+        decl = '{crc_t} {crc_update_function}_{0:s}({crc_t} crc, const void *data, size_t data_len);'.format(
+                variant, **sym)
+        if variant in ('clmul', 'sse42'):
+            out += [CodeGen(opt, None, ['#if defined(__GNUC__) && defined(__x86_64__)']),
+                    decl,
+                    CodeGen(opt, None, ['#endif'])]
+        else:
+            out.append(decl)
+    return out
+
+
+def _crc_dispatch_function_gen(opt, sym):
+    """
+    Return the code of the variants of the update function and of the
+    update function which dispatches to them.
+
+    The variant is selected on the first call of the update function by a
+    resolver function, which queries the features of the CPU with
+    __builtin_cpu_supports() and stores the pointer of the fastest variant.
+    Concurrent first calls store the same pointer.
+    """
+    def variant(name, body, attribute=None):
+        return [
+                '', '',
+                Conditional(opt, '', attribute is not None, [
+                    CodeGen(opt, None, ['#if defined(__GNUC__) && defined(__x86_64__)']),
+                    '__attribute__((target("{0}")))'.format(attribute),
+                    ]),
+                '{crc_t} {crc_update_function}_{0:s}({crc_t} crc, const void *data, size_t data_len)'.format(name, **sym),
+                '{',
+                CodeGen(opt, 4*' ', [
+                    'const unsigned char *d = (const unsigned char *)data;',
+                    'unsigned int tbl_idx;',
+                    '',
+                    ] + body + [
+                    'return {0};'.format(expr.And('crc', sym['cfg_mask']).simplify()),
+                    ]),
+                '}',
+                Conditional(opt, '', attribute is not None, [
+                    CodeGen(opt, None, ['#endif']),
+                    ]),
+                ]
+
+    variants = _dispatch_variants(opt)
+    update_t = '{crc_t} (*{{0:s}})({crc_t} crc, const void *data, size_t data_len)'.format(**sym)
+    out = variant('table', [_crc_table_byte_loop(opt, sym)])
+    if opt.slice_by > 1:
+        out += variant(variants[1], [_crc_table_slice_by_loop(opt, sym), _crc_table_byte_loop(opt, sym)])
+    out += variant('clmul', [_crc_clmul_algorithm(opt, sym), '', _crc_table_byte_loop(opt, sym)], 'pclmul,sse4.1')
+    out += [
+            '', '',
+            'static {crc_t} {crc_update_function}_resolve({crc_t} crc, const void *data, size_t data_len);'.format(**sym),
+            'static {0:s} = {crc_update_function}_resolve;'.format(update_t.format('{0:s}_impl'.format(sym['crc_update_function'])), **sym),
+            '',
+            Comment(opt, '', [
+                'Select the fastest variant of {crc_update_function}() for the CPU and call it.'.format(**sym),
+                ]),
+            'static {crc_t} {crc_update_function}_resolve({crc_t} crc, const void *data, size_t data_len)'.format(**sym),
+            '{',
+            CodeGen(opt, 4*' ', [
+                '{0:s} = {1:s}_{2:s};'.format(update_t.format('impl'), sym['crc_update_function'], variants[1] if opt.slice_by > 1 else 'table'),
+                '',
+                CodeGen(opt, None, ['#if defined(__GNUC__) && defined(__x86_64__)']),
+                '__builtin_cpu_init();',
+                'if (__builtin_cpu_supports("pclmul") && __builtin_cpu_supports("sse4.1")) {',
+                CodeGen(opt, 4*' ', [
+                    'impl = {crc_update_function}_clmul;'.format(**sym),
+                    ]),
+                '}',
+                Conditional(opt, '', _use_crc32_instruction(opt), [
+                    'if (__builtin_cpu_supports("sse4.2")) {',
+                    CodeGen(opt, 4*' ', [
+                        'impl = {crc_update_function}_sse42;'.format(**sym),
+                        ]),
+                    '}',
+                    ]),
+                CodeGen(opt, None, ['#endif']),
+                '{crc_update_function}_impl = impl;'.format(**sym),
+                'return impl(crc, data, data_len);',
+                ]),
+            '}',
+            '',
+            '',
+            _crc_update_function_def(opt, sym),
+            '{',
+            CodeGen(opt, 4*' ', [
+                'return {crc_update_function}_impl(crc, data, data_len);'.format(**sym),
+                ]),
+            '}',
+            ]
+    return out
+
+
 def _crc_finalize_function_gen(opt, sym):
     """
     Return the code for the finalize function.
@@ -1432,15 +1723,16 @@ def _crc_table_core_algorithm(opt, sym):
     ]
     return CodeGen(opt, '', out)
 
-def _crc_table_core_algorithm_reflected(opt, sym):
+def _crc_table_core_algorithm_reflected(opt, sym, crc='crc', data='*d'):
     """
     Return the core loop of the table-driven algorithm, reflected variant.
+    crc is the name of the register and data the expression of the octet.
     """
     out = []
     if opt.width is not None and opt.tbl_idx_width is not None and opt.width <= opt.tbl_idx_width:
         crc_xor_expr = '0'
     else:
-        crc_xor_expr = '(crc >> {cfg_table_idx_width})'.format(**sym)
+        crc_xor_expr = '({0:s} >> {cfg_table_idx_width})'.format(crc, **sym)
 
     if opt.tbl_idx_width == 8:
         if opt.slice_by > 1:
@@ -1449,42 +1741,43 @@ def _crc_table_core_algorithm_reflected(opt, sym):
             crc_lookup = 'crc_table[tbl_idx]'
         out += [
                 Conditional2(opt, '', opt.width is None or opt.width > 8, [
-                    'tbl_idx = (crc ^ *d) & {crc_table_mask};'.format(**sym),
+                    'tbl_idx = ({0:s} ^ {1:s}) & {crc_table_mask};'.format(crc, data, **sym),
                     ], [
-                    'tbl_idx = crc ^ *d;',
+                    'tbl_idx = {0:s} ^ {1:s};'.format(crc, data),
                     ]),
-                    'crc = {0};'.format(expr.And(expr.Parenthesis(expr.Xor(crc_lookup, expr.Parenthesis(expr.Shr('crc', sym['cfg_table_idx_width'])))), sym['cfg_mask']).simplify()),
+                    '{0:s} = {1};'.format(crc, expr.And(expr.Parenthesis(expr.Xor(crc_lookup, expr.Parenthesis(expr.Shr(crc, sym['cfg_table_idx_width'])))), sym['cfg_mask']).simplify()),
                 ]
     else:
         crc_lookup = 'crc_table[tbl_idx & {crc_table_mask}]'.format(**sym)
         for i in range(8 // opt.tbl_idx_width):
             out += [
-                'tbl_idx = {0};'.format(expr.Xor('crc', expr.Parenthesis(expr.Shr('*d', expr.Parenthesis(expr.Mul(i, sym['cfg_table_idx_width']))))).simplify()),
-                'crc = {0};'.format(expr.Xor(crc_lookup, crc_xor_expr).simplify())
+                'tbl_idx = {0};'.format(expr.Xor(crc, expr.Parenthesis(expr.Shr(data, expr.Parenthesis(expr.Mul(i, sym['cfg_table_idx_width']))))).simplify()),
+                '{0:s} = {1};'.format(crc, expr.Xor(crc_lookup, crc_xor_expr).simplify())
                 ]
     return CodeGen(opt, '', out)
 
-def _crc_table_core_algorithm_nonreflected(opt, sym):
+def _crc_table_core_algorithm_nonreflected(opt, sym, crc='crc', data='*d'):
     """
     Return the core loop of the table-driven algorithm, non-reflected variant.
+    crc is the name of the register and data the expression of the octet.
     """
     out = []
     if opt.width == None:
-        crc_shifted_right = expr.Parenthesis(expr.Shr('crc', expr.Parenthesis(expr.Sub(sym['cfg_width'], sym['cfg_table_idx_width'])))).simplify()
+        crc_shifted_right = expr.Parenthesis(expr.Shr(crc, expr.Parenthesis(expr.Sub(sym['cfg_width'], sym['cfg_table_idx_width'])))).simplify()
     elif opt.width < 8:
         shift_val = opt.width - opt.tbl_idx_width
         if shift_val < 0:
-            crc_shifted_right = expr.Parenthesis(expr.Shl('crc', -shift_val)).simplify()
+            crc_shifted_right = expr.Parenthesis(expr.Shl(crc, -shift_val)).simplify()
         else:
-            crc_shifted_right = expr.Parenthesis(expr.Shr('crc', shift_val)).simplify()
+            crc_shifted_right = expr.Parenthesis(expr.Shr(crc, shift_val)).simplify()
     else:
         shift_val = opt.width - opt.tbl_idx_width
-        crc_shifted_right = expr.Parenthesis(expr.Shr('crc', shift_val)).simplify()
+        crc_shifted_right = expr.Parenthesis(expr.Shr(crc, shift_val)).simplify()
 
     if opt.width is not None and opt.tbl_idx_width is not None and opt.width <= opt.tbl_idx_width:
         crc_xor_expr = '0'
     else:
-        crc_xor_expr = '(crc << {cfg_table_idx_width})'.format(**sym)
+        crc_xor_expr = '({0:s} << {cfg_table_idx_width})'.format(crc, **sym)
 
     if opt.tbl_idx_width == 8:
         if opt.slice_by > 1:
@@ -1493,77 +1786,467 @@ def _crc_table_core_algorithm_nonreflected(opt, sym):
             crc_lookup = 'crc_table[tbl_idx]'
         out += [
                 Conditional2(opt, '', opt.width is None or opt.width > 8, [
-                    'tbl_idx = {0};'.format(expr.And(expr.Parenthesis(expr.Xor(crc_shifted_right, '*d')), sym['crc_table_mask']).simplify())
+                    'tbl_idx = {0};'.format(expr.And(expr.Parenthesis(expr.Xor(crc_shifted_right, data)), sym['crc_table_mask']).simplify())
                     ], [
-                    'tbl_idx = {0};'.format(expr.Xor(crc_shifted_right, '*d').simplify())
+                    'tbl_idx = {0};'.format(expr.Xor(crc_shifted_right, data).simplify())
                     ]),
-                    'crc = {0};'.format(expr.And(expr.Parenthesis(expr.Xor(crc_lookup, crc_xor_expr)), sym['cfg_mask']).simplify())
+                    '{0:s} = {1};'.format(crc, expr.And(expr.Parenthesis(expr.Xor(crc_lookup, crc_xor_expr)), sym['cfg_mask']).simplify())
                 ]
     else:
         crc_lookup = 'crc_table[tbl_idx & {crc_table_mask}]'.format(**sym)
         for i in range(8 // opt.tbl_idx_width):
             str_idx = '{0:d}'.format(8 - (i + 1) * opt.tbl_idx_width)
             out += [
-                    'tbl_idx = {0};'.format(expr.Xor(crc_shifted_right, expr.Parenthesis(expr.Shr('*d', str_idx)))),
-                    'crc = {0};'.format(expr.Xor(crc_lookup, crc_xor_expr).simplify()),
+                    'tbl_idx = {0};'.format(expr.Xor(crc_shifted_right, expr.Parenthesis(expr.Shr(data, str_idx)))),
+                    '{0:s} = {1};'.format(crc, expr.Xor(crc_lookup, crc_xor_expr).simplify()),
                     ]
     return CodeGen(opt, '', out)
 
-def _crc_table_slice_by_algorithm(opt, sym):
-    update_be = []
-    for i in range(opt.slice_by // 4):
-        vard = 'd{0}'.format(opt.slice_by // 4 - i)
-        for j in range(4):
-            idx1 = i * 4 + j
-            idx2 = expr.And(expr.Parenthesis(expr.Shr(vard, j*8)), expr.Terminal(255, '0xffu')).simplify()
-            update_be.append('crc_table[{0}][{1}]{2}'.format(idx1, idx2, ' ^' if idx1 < opt.slice_by - 1 else ';'))
-
-    update_le = []
-    for i in range(opt.slice_by // 4):
-        vard = 'd{0}'.format(opt.slice_by // 4 - i)
-        for j in range(4):
-            idx1 = i * 4 + j
-            idx2 = expr.And(expr.Parenthesis(expr.Shr(vard, 24 - j*8)), expr.Terminal(255, '0xffu')).simplify()
-            update_le.append('crc_table[{0}][{1}]{2}'.format(idx1, idx2, ' ^' if idx1 < opt.slice_by - 1 else ';'))
+def _crc_table_fast_loops(opt, sym):
+    """
+    Return the loops of the table-driven update function which run before
+    the loop over the remaining octets: slice-by, interleaved streams or
+    clmul.  The list is selected here and not with Conditional, as these
+    loops can only be generated for fully defined models.
+    """
+    if opt.slice_by > 1:
+        return [_crc_table_slice_by_loop(opt, sym)]
+    if opt.streams > 1:
+        return [_crc_table_streams_loop(opt, sym)]
+    if opt.clmul:
+        return [
+                CodeGen(opt, None, [
+                    '#if defined(__PCLMUL__) && defined(__SSE4_1__)',
+                    ]),
+                _crc_clmul_algorithm(opt, sym),
+                CodeGen(opt, None, [
+                    '#endif',
+                    ]),
+                '',
+                ]
+    return []
+
+
+def _crc_table_byte_loop(opt, sym):
+    """
+    Return the loop of the table-driven algorithm over the remaining octets.
+    """
+    return CodeGen(opt, '', [
+        'while (data_len--) {',
+        CodeGen(opt, 4*' ', [
+            _crc_table_core_algorithm(opt, sym),
+            ]),
+        '}',
+        ])
+
+def _crc_table_slice_by_loop(opt, sym):
+    """
+    Return the slice-by algorithm, including the alignment of the data.
+    """
+    if opt.slice_by < 2:
+        return CodeGen(opt, '', [])
+    return CodeGen(opt, '', [
+        '/* Align to a multiple of {crc_slice_by} bytes */'.format(**sym),
+        'while (data_len && (((uintptr_t)(const void *)d) % {crc_slice_by} != 0))'.format(**sym) + ' {',
+        CodeGen(opt, 4*' ', [
+            _crc_table_core_algorithm(opt, sym),
+            'data_len--;',
+            ]),
+        '}',
+        '',
+        _crc_table_streams_loop(opt, sym),
+        _crc_table_slice_by_algorithm(opt, sym),
+        '/* Remaining bytes with the standard algorithm */',
+        'd = (const unsigned char *)d32;',
+        ])
+
+def _crc_stream_shift_gen(opt, sym):
+    """
+    Return the code of the function which feeds the length of a stream in
+    zero octets into the register, with one table per octet of the register.
+    """
+    if opt.streams < 2:
+        return []
+    num_tables = (opt.width + 7) // 8
+    lookups = []
+    for k in range(num_tables):
+        idx = expr.And(expr.Parenthesis(expr.Shr('crc', 8 * k)), expr.Terminal(255, '0xff')).simplify()
+        lookups.append('crc_stream_shift_table[{0:d}][{1}]{2:s}'.format(
+            k, idx, ' ^' if k < num_tables - 1 else ';'))
+    return [
+            '', '',
+            Comment(opt, '', [
+                'Tables which feed {crc_stream_block} zero octets into the register.'.format(**sym),
+                ]),
+            'static const {0:s} crc_stream_shift_table[{1:d}][256] = {2:s};'.format(
+                sym['crc_t'], num_tables, sym['crc_stream_shift_table_init']),
+            '',
+            'static {crc_t} crc_stream_shift({crc_t} crc)'.format(**sym),
+            '{',
+            CodeGen(opt, 4*' ', [
+                'return',
+                CodeGen(opt, 4*' ', lookups),
+                ]),
+            '}',
+            ]
+
+def _crc_combine_function_gen(opt, sym):
+    """
+    Return the code of the shift_zeros and combine functions.
+
+    Both work on final crc values, in their bit order.  Feeding n zero
+    octets into the crc multiplies it by x^(8 * n) modulo the polynomial;
+    the table holds the factors for n = 2^k, so that a length is processed
+    in one multiplication per set bit.
+    """
+    if not opt.combine:
+        return []
+    if opt.reflect_out:
+        multiply = [
+                'if (a & {crc_msb_mask}) {{'.format(**sym),
+                '    prod ^= b;',
+                '}',
+                'a = (a << 1) & {crc_mask};'.format(**sym),
+                'if (b & 1) {',
+                '    b = (b >> 1) ^ {crc_combine_poly};'.format(**sym),
+                '} else {',
+                '    b >>= 1;',
+                '}',
+                ]
+    else:
+        multiply = [
+                'if (a & 1) {',
+                '    prod ^= b;',
+                '}',
+                'a >>= 1;',
+                'if (b & {crc_msb_mask}) {{'.format(**sym),
+                '    b = ((b << 1) ^ {crc_combine_poly}) & {crc_mask};'.format(**sym),
+                '} else {',
+                '    b = (b << 1) & {crc_mask};'.format(**sym),
+                '}',
+                ]
+    return [
+            '', '',
+            Comment(opt, '', [
+                'The crc values of 2^k zero bytes, for a crc register of value 1.',
+                ]),
+            'static const {0:s} crc_zeros_table[{1:s}] = {2:s};'.format(
+                sym['crc_t'], sym['crc_zeros_operators'], sym['crc_zeros_operator_table_init']),
+            '',
+            Comment(opt, '', [
+                'Multiply two crc values as polynomials modulo the crc polynomial.',
+                ]),
+            'static {crc_t} crc_multiply({crc_t} a, {crc_t} b)'.format(**sym),
+            '{',
+            '    {crc_t} prod = 0;'.format(**sym),
+            '',
+            '    while (a != 0) {',
+            CodeGen(opt, 8*' ', multiply),
+            '    }',
+            '    return prod;',
+            '}',
+            '',
+            Comment(opt, '', [
+                'Feed len zero bytes into a crc value without the final xor.',
+                ]),
+            'static {crc_t} crc_zeros({crc_t} crc, size_t len)'.format(**sym),
+            '{',
+            '    unsigned int k;',
+            '',
+            '    for (k = 0; len != 0; k++) {',
+            '        if (len & 1) {',
+            '            crc = crc_multiply(crc_zeros_table[k], crc);',
+            '        }',
+            '        len >>= 1;',
+            '    }',
+            '    return crc;',
+            '}',
+            '',
+            '',
+            '{crc_t} {crc_shift_zeros_function}({crc_t} crc, size_t len)'.format(**sym),
+            '{',
+            '    return {0};'.format(expr.Xor(
+                expr.FunctionCall('crc_zeros', [expr.Xor('crc', sym['crc_xor_out']).simplify(), 'len']),
+                sym['crc_xor_out']).simplify()),
+            '}',
+            '',
+            '',
+            '{crc_t} {crc_combine_function}({crc_t} crc1, {crc_t} crc2, size_t len2)'.format(**sym),
+            '{',
+            '    return {0};'.format(expr.Xor(
+                expr.FunctionCall('crc_zeros', [expr.Xor('crc1', sym['crc_combine_xor']).simplify(), 'len2']),
+                'crc2').simplify()),
+            '}',
+            ]
+
 
+def _crc_table_streams_loop(opt, sym):
+    """
+    Return the loop which updates opt.streams registers over consecutive
+    blocks of the data.
+
+    The register crc starts with the current value, the other registers
+    with zero.  The registers are independent, so the processor can overlap
+    their table lookups.  At the end of each block, the registers are
+    combined by feeding the length of a block in zero octets into the
+    previous register.
+    """
+    if opt.streams < 2:
+        return CodeGen(opt, '', [])
+    streams = opt.streams
+    block = sym['crc_stream_block']
+    crcs = ['crc'] + ['crc{0:d}'.format(k) for k in range(1, streams)]
+    decls = []
+    body = []
+    if opt.slice_by > 1:
+        for k in range(streams):
+            if k == 0:
+                src = 'd'
+            else:
+                src = '(d + {0:s})'.format(block if k == 1 else '{0:d} * {1:s}'.format(k, block))
+            decls.append('const uint32_t *d32_{0:d} = (const uint32_t *){1:s};'.format(k, src))
+        for k in range(streams):
+            body += _crc_table_slice_by_step(opt, sym, crc=crcs[k], src='d32_{0:d}'.format(k),
+                    var='d{0:d}_'.format(k))
+        loop_len = '{0:s} / {crc_slice_by}'.format(block, **sym)
+    else:
+        for k in range(streams):
+            if k == 0:
+                data = 'd[i]'
+            else:
+                data = 'd[i + {0:s}]'.format(block if k == 1 else '{0:d} * {1:s}'.format(k, block))
+            body.append(Conditional2(opt, '', opt.reflect_in, [
+                _crc_table_core_algorithm_reflected(opt, sym, crcs[k], data),
+                ], [
+                _crc_table_core_algorithm_nonreflected(opt, sym, crcs[k], data),
+                ]))
+        loop_len = block
+    decls += ['{0:s} {1:s} = 0;'.format(sym['crc_t'], c) for c in crcs[1:]]
+    decls.append('unsigned int i;')
+    return CodeGen(opt, '', [
+        '/* {0:d} interleaved streams of {1:s} bytes */'.format(streams, block),
+        'while (data_len >= {0:d} * {1:s}) '.format(streams, block) + '{',
+        CodeGen(opt, 4*' ', decls + [
+            '',
+            'for (i = 0; i < {0:s}; i++) '.format(loop_len) + '{',
+            CodeGen(opt, 4*' ', body),
+            '}',
+            ] + ['crc = crc_stream_shift(crc) ^ {0:s};'.format(c) for c in crcs[1:]] + [
+            'd += {0:d} * {1:s};'.format(streams, block),
+            'data_len -= {0:d} * {1:s};'.format(streams, block),
+            ]),
+        '}',
+        '',
+        ])
+
+def _crc_table_slice_by_step(opt, sym, crc='crc', src='d32', var='d'):
+    """
+    Return the statements which feed one block of the slice-by algorithm
+    into the register crc, reading the words from the pointer src into the
+    variables var1, var2, ...
+
+    The octets are read as 32 bit words in the bit order of the model:
+    little-endian for reflected models, big-endian otherwise; the words are
+    byte-swapped if the host has the other byte order.  The register
+    is xor-ed into the first width bits of the block; the tables then give
+    the CRC of each octet followed by the remaining octets of the block.
+    If the register is wider than the block, its remaining bits are shifted
+    by the length of the block.
+    """
+    num_words = opt.slice_by // 4
+    block_bits = 8 * opt.slice_by
+    words = ['uint32_t {0:s}{1:d} = *{2:s}++;'.format(var, i + 1, src) for i in range(num_words)]
+    words.append(CodeGen(opt, None, [
+        '#if __BYTE_ORDER == {0:s}'.format('__BIG_ENDIAN' if opt.reflect_in else '__LITTLE_ENDIAN'),
+        ]))
+    for i in range(num_words):
+        words.append('{0:s} = ({0:s} >> 24) | (({0:s} >> 8) & 0xff00u) | '
+                '(({0:s} << 8) & 0xff0000u) | ({0:s} << 24);'.format('{0:s}{1:d}'.format(var, i + 1)))
+    words.append(CodeGen(opt, None, [
+        '#endif',
+        ]))
+    for i in range(num_words):
+        if opt.reflect_in:
+            shift = -32 * i
+        else:
+            shift = 32 * (i + 1) - opt.width
+        if opt.width <= 32 * i:
+            continue
+        elif shift > 0:
+            crc_bits = '(uint32_t){0:s} << {1:d}'.format(crc, shift)
+        elif shift == 0:
+            crc_bits = '(uint32_t){0:s}'.format(crc)
+        else:
+            crc_bits = '(uint32_t)({0:s} >> {1:d})'.format(crc, -shift)
+        words.append('{0:s}{1:d} ^= {2:s};'.format(var, i + 1, crc_bits))
+
+    update = []
+    for k in range(opt.slice_by):
+        if opt.reflect_in:
+            octet_shift = 8 * (k % 4)
+        else:
+            octet_shift = 24 - 8 * (k % 4)
+        idx = expr.And(expr.Parenthesis(expr.Shr('{0:s}{1:d}'.format(var, k // 4 + 1), octet_shift)),
+                expr.Terminal(255, '0xffu')).simplify()
+        update.append('crc_table[{0:d}][{1}]{2:s}'.format(
+            opt.slice_by - 1 - k, idx, ' ^' if k < opt.slice_by - 1 else ';'))
+    if opt.width > block_bits:
+        if opt.reflect_in:
+            update.insert(0, '({0:s} >> {1:d}) ^'.format(crc, block_bits))
+        else:
+            update.insert(0, '{0} ^'.format(expr.Parenthesis(expr.And(
+                expr.Parenthesis(expr.Shl(crc, block_bits)), sym['cfg_mask'])).simplify()))
+    return words + [
+            '{0:s}  ='.format(crc),
+            CodeGen(opt, 4*' ', update),
+            ]
+
+def _crc_table_slice_by_algorithm(opt, sym):
+    """
+    Return the main loop of the slice-by algorithm.
+    """
     out = [
             'const uint32_t *d32 = (const uint32_t *)d;',
             'while (data_len >= {crc_slice_by})'.format(**sym),
             '{',
+            CodeGen(opt, 4*' ', _crc_table_slice_by_step(opt, sym) + [
+                '',
+                'data_len -= {crc_slice_by};'.format(**sym),
+                ]),
+            '}',
+            '',
+            ]
+    return CodeGen(opt, '', out)
+
+def _clmul_fold_constants(opt, distance):
+    """
+    Return the pair of 64 bit constants (high, low) which fold the high and
+    the low half of a 128 bit block by distance bits, i.e. x^(distance + 64)
+    mod P and x^distance mod P.
+
+    The carry-less product of two bit-reflected 64 bit operands is the
+    reflected product shifted by one bit; the constants of the reflected
+    models are therefore x^(distance + 63) and x^(distance - 1) mod P, bit
+    reflected to 64 bits.
+    """
+    poly = opt.poly | (1 << opt.width)
+    def xpow_mod(exponent):
+        reg = 1
+        for _ in range(exponent):
+            reg <<= 1
+            if reg >> opt.width:
+                reg ^= poly
+        return reg
+    if opt.reflect_in:
+        exponents = (distance + 63, distance - 1)
+    else:
+        exponents = (distance + 64, distance)
+    constants = []
+    for exponent in exponents:
+        k = xpow_mod(exponent)
+        if opt.reflect_in:
+            k = int('{0:064b}'.format(k)[::-1], 2)
+        constants.append('0x{0:016x}'.format(k))
+    return constants
+
+def _crc_clmul_algorithm(opt, sym):
+    """
+    Return the main loop of the clmul algorithm.
+
+    Four 128 bit accumulators are folded forward by 512 bits with carry-less
+    multiplications until less than 64 octets are left; they are then folded
+    into one accumulator, which in turn consumes the remaining 16 octet blocks.
+    The register is xor-ed into the first width bits of the first block, as in
+    the slice-by algorithm.  The accumulator is congruent to the message
+    modulo the polynomial, so the final reduction runs its 16 octets through
+    the table, starting with a zero register.  The non-aligned head and the
+    tail of the message are handled by the table-driven algorithm.
+
+    Reflected models keep the blocks in little-endian order, where the low
+    64 bits hold the higher order coefficients; the other models byte-swap
+    the blocks to big-endian order.
+    """
+    if opt.width is None or opt.poly is None:
+        return CodeGen(opt, '', [])
+    k512 = _clmul_fold_constants(opt, 512)
+    k128 = _clmul_fold_constants(opt, 128)
+    if opt.reflect_in:
+        # (low lane, high lane) = (high, low) constant
+        k512_init = '_mm_set_epi64x((long long){1:s}ULL, (long long){0:s}ULL)'.format(*k512)
+        k128_init = '_mm_set_epi64x((long long){1:s}ULL, (long long){0:s}ULL)'.format(*k128)
+        crc_init = '_mm_set_epi64x(0, (long long)crc)'
+        load = '_mm_load_si128(d128++)'
+    else:
+        k512_init = '_mm_set_epi64x((long long){0:s}ULL, (long long){1:s}ULL)'.format(*k512)
+        k128_init = '_mm_set_epi64x((long long){0:s}ULL, (long long){1:s}ULL)'.format(*k128)
+        if opt.width < 64:
+            crc_init = '_mm_set_epi64x((long long)((uint64_t)crc << {0:d}), 0)'.format(64 - opt.width)
+        else:
+            crc_init = '_mm_set_epi64x((long long)crc, 0)'
+        load = '_mm_shuffle_epi8(_mm_load_si128(d128++), bswap)'
+
+    def fold(acc, k, data):
+        return '{0:s} = _mm_xor_si128(_mm_xor_si128(_mm_clmulepi64_si128({0:s}, {1:s}, 0x00), ' \
+                '_mm_clmulepi64_si128({0:s}, {1:s}, 0x11)), {2:s});'.format(acc, k, data)
+
+    out = [
+            '/* Align to a multiple of 16 bytes */',
+            'while (data_len && (((uintptr_t)(const void *)d) % 16 != 0)) {',
             CodeGen(opt, 4*' ', [
-                CodeGen(opt, None, [
-                    '#if __BYTE_ORDER == __BIG_ENDIAN',
-                    ]),
-                '{crc_t} d1 = *d32++ ^ le16toh(crc);'.format(**sym),
-                Conditional(opt, '', opt.slice_by >= 8, [
-                    '{crc_t} d2 = *d32++;'.format(**sym),
-                    ]),
-                Conditional(opt, '', opt.slice_by >= 16, [
-                    '{crc_t} d3 = *d32++;'.format(**sym),
-                    '{crc_t} d4 = *d32++;'.format(**sym),
+                _crc_table_core_algorithm(opt, sym),
+                'data_len--;',
+                ]),
+            '}',
+            'if (data_len >= 64) {',
+            CodeGen(opt, 4*' ', [
+                'const __m128i *d128 = (const __m128i *)(const void *)d;',
+                'const __m128i k512 = {0:s};'.format(k512_init),
+                'const __m128i k128 = {0:s};'.format(k128_init),
+                Conditional(opt, '', not opt.reflect_in, [
+                    'const __m128i bswap = _mm_set_epi8(0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15);',
                     ]),
-                'crc  =',
-                CodeGen(opt, 4*' ', update_be),
-                CodeGen(opt, None, [
-                    '#else',
+                '__m128i x0 = _mm_xor_si128({0:s}, {1:s});'.format(load, crc_init),
+                '__m128i x1 = {0:s};'.format(load),
+                '__m128i x2 = {0:s};'.format(load),
+                '__m128i x3 = {0:s};'.format(load),
+                'unsigned char buf[16];',
+                'unsigned int i;',
+                '',
+                'data_len -= 64;',
+                'while (data_len >= 64) {',
+                CodeGen(opt, 4*' ', [
+                    fold('x0', 'k512', load),
+                    fold('x1', 'k512', load),
+                    fold('x2', 'k512', load),
+                    fold('x3', 'k512', load),
+                    'data_len -= 64;',
                     ]),
-                '{crc_t} d1 = *d32++ ^ crc;'.format(**sym),
-                Conditional(opt, '', opt.slice_by >= 8, [
-                    '{crc_t} d2 = *d32++;'.format(**sym),
+                '}',
+                fold('x0', 'k128', 'x1'),
+                fold('x0', 'k128', 'x2'),
+                fold('x0', 'k128', 'x3'),
+                'while (data_len >= 16) {',
+                CodeGen(opt, 4*' ', [
+                    fold('x0', 'k128', load),
+                    'data_len -= 16;',
                     ]),
-                Conditional(opt, '', opt.slice_by >= 16, [
-                    '{crc_t} d3 = *d32++;'.format(**sym),
-                    '{crc_t} d4 = *d32++;'.format(**sym),
+                '}',
+                '',
+                '/* Reduce the folded block with the standard algorithm */',
+                Conditional2(opt, '', opt.reflect_in, [
+                    '_mm_storeu_si128((__m128i *)(void *)buf, x0);',
+                    ], [
+                    '_mm_storeu_si128((__m128i *)(void *)buf, _mm_shuffle_epi8(x0, bswap));',
                     ]),
-                'crc  =',
-                CodeGen(opt, 4*' ', update_le),
-                CodeGen(opt, None, [
-                    '#endif',
+                'd = buf;',
+                'crc = 0;',
+                'for (i = 0; i < 16; i++) {',
+                CodeGen(opt, 4*' ', [
+                    _crc_table_core_algorithm(opt, sym),
                     ]),
-                '',
-                'data_len -= {crc_slice_by};'.format(**sym),
+                '}',
+                'd = (const unsigned char *)d128;',
                 ]),
             '}',
-            '',
             ]
     return CodeGen(opt, '', out)
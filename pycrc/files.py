@@ -0,0 +1,143 @@
+#  pycrc -- parameterisable CRC calculation utility and C source code generator
+#
+#  Copyright (c) 2006-2017  Thomas Pircher  <tehpeh-web@tty1.net>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+
+
+"""
+Calculation of the CRC of files.
+
+file_blocks() yields the content of a file as a sequence of buffers without
+copying it where possible, and crc_file_parallel() splits a file into byte
+ranges whose CRCs are calculated in a process pool and merged with
+Crc.combine().
+
+    from pycrc.algorithms import Crc
+    from pycrc.files import crc_file_parallel
+
+    crc = Crc(width=32, poly=0x04c11db7, reflect_in=True, xor_in=0xffffffff,
+              reflect_out=True, xor_out=0xffffffff)
+    print("{0:#x}".format(crc_file_parallel(crc, "file.bin", 4)))
+"""
+
+from pycrc.algorithms import Crc
+import io
+import mmap
+import multiprocessing
+import os
+import stat
+
+
+def file_blocks(f, offset=0, length=None, block_size=1024 * 1024):
+    """
+    Yield the content of the open binary file f as a sequence of memoryview
+    blocks of at most block_size octets, starting at offset and ending after
+    length octets or at the end of the file.
+
+    Regular files are memory-mapped and the blocks are slices of the mapping,
+    so no data is copied.  The mapping is copy-on-write, so that the blocks
+    are writable buffers which can be passed to C code by address; they are
+    never written to.  Other files, such as pipes, and all files on Python 2,
+    where an mmap object can't be wrapped in a memoryview, are read with
+    readinto() into a single reused buffer.  In both cases a block is only
+    valid until the next one is requested.
+    """
+    mapping = None
+    view = None
+    try:
+        file_stat = os.fstat(f.fileno())
+        size = file_stat.st_size
+        if size > offset and stat.S_ISREG(file_stat.st_mode):
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            view = memoryview(mapping)
+    except (AttributeError, EnvironmentError, TypeError, ValueError, io.UnsupportedOperation):
+        if mapping is not None:
+            mapping.close()
+        view = None
+
+    if view is not None:
+        end = size if length is None else min(size, offset + length)
+        if hasattr(mapping, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mapping.madvise(mmap.MADV_SEQUENTIAL)
+        block = None
+        try:
+            for pos in range(offset, end, block_size):
+                block = view[pos:min(pos + block_size, end)]
+                yield block
+                block.release()
+        finally:
+            if block is not None:
+                block.release()
+            view.release()
+            mapping.close()
+    else:
+        if offset:
+            f.seek(offset)
+        buf = memoryview(bytearray(block_size))
+        while length is None or length > 0:
+            num = f.readinto(buf if length is None or length >= block_size else buf[:length])
+            if not num:
+                break
+            if length is not None:
+                length -= num
+            yield buf[:num]
+
+
+def _crc_file_range(args):
+    """
+    Return the table-driven CRC of length octets of a file, starting at
+    offset.  This is the worker function of crc_file_parallel().
+    """
+    params, filename, offset, length = args
+    crc = Crc(*params).new()
+    with open(filename, 'rb') as f:
+        for block in file_blocks(f, offset, length):
+            crc.update(block)
+    return crc.intdigest()
+
+
+def crc_file_parallel(alg, filename, jobs):
+    """
+    Calculate the CRC of a file with jobs worker processes.
+
+    The file is split into jobs contiguous byte ranges; the CRC of each range
+    is calculated in a process pool and the partial results are merged with
+    Crc.combine().  The result is identical to the CRC of the whole file.
+    """
+    size = os.path.getsize(filename)
+    params = (alg.width, alg.poly, alg.reflect_in, alg.xor_in, alg.reflect_out, alg.xor_out,
+              alg.tbl_idx_width, alg.slice_by, alg.backend)
+    chunk_size = max((size + jobs - 1) // jobs, 1)
+    ranges = [(params, filename, offset, min(chunk_size, size - offset))
+              for offset in range(0, size, chunk_size)]
+    if len(ranges) <= 1:
+        return _crc_file_range((params, filename, 0, size))
+
+    pool = multiprocessing.Pool(min(jobs, len(ranges)))
+    try:
+        partial_crcs = pool.map(_crc_file_range, ranges)
+    finally:
+        pool.close()
+        pool.join()
+
+    crc = partial_crcs[0]
+    for partial_crc, (dummy_params, dummy_filename, dummy_offset, length) in zip(partial_crcs[1:], ranges[1:]):
+        crc = alg.combine(crc, partial_crc, length)
+    return crc
@@ -41,15 +41,71 @@ To print the parameters of a particular model:
         print("Check:        {check:#x}".format(**m))
     else:
         print("model not found.")
+
+To find the models with a given set of parameters or check value:
+
+    print(models.names_by_params(16, 0x1021, False, 0x0, False, 0x0))
+    print(models.names_by_check(32, 0xcbf43926))
 """
 
+try:
+    from types import MappingProxyType as _ReadOnlyDict
+except ImportError:
+    import collections
+
+    class _ReadOnlyDict(collections.Mapping):
+        """
+        A read-only view of a dict, for Python versions without
+        types.MappingProxyType.
+        """
+
+        def __init__(self, data):
+            self._data = data
+
+        def __getitem__(self, key):
+            return self._data[key]
+
+        def __iter__(self):
+            return iter(self._data)
+
+        def __len__(self):
+            return len(self._data)
+
+
+
+def _params_key(width, poly, reflect_in, xor_in, reflect_out, xor_out):
+    """
+    Return the key of the parameter index.
+    """
+    return (width, poly, bool(reflect_in), xor_in, bool(reflect_out), xor_out)
+
+
+def _build_index(models):
+    """
+    Return the name index, the parameter index and the check value index of
+    the list of models.  The last two map to tuples of names in the order of
+    the list of models.
+    """
+    by_name = {}
+    by_params = {}
+    by_check = {}
+    for model in models:
+        by_name[model['name']] = model
+        key = _params_key(model['width'], model['poly'], model['reflect_in'],
+                          model['xor_in'], model['reflect_out'], model['xor_out'])
+        by_params[key] = by_params.get(key, ()) + (model['name'],)
+        key = (model['width'], model['check'])
+        by_check[key] = by_check.get(key, ()) + (model['name'],)
+    return by_name, by_params, by_check
 
 
 class CrcModels(object):
     """
     CRC Models.
 
-    All models are defined as constant class variables.
+    All models are defined as constant class variables.  The models are
+    read-only mappings; get_params() returns a copy as a dict.  The indices
+    are built once, when the module is imported.
     """
 
     models = []
@@ -315,6 +371,9 @@ class CrcModels(object):
         'check':         0x995dc9bbdf1939fa,
     })
 
+    models = tuple(_ReadOnlyDict(model) for model in models)
+    _by_name, _by_params, _by_check = _build_index(models)
+
 
     def names(self):
         """
@@ -326,9 +385,29 @@ class CrcModels(object):
     def get_params(self, model):
         """
         This function returns the parameters of a given model.
+        The model name is not case sensitive.
+        """
+        params = self._by_name.get(model)
+        if params is None:
+            params = self._by_name.get(model.lower())
+        if params is None:
+            return None
+        return dict(params)
+
+
+    def names_by_params(self, width, poly, reflect_in, xor_in, reflect_out, xor_out):
+        """
+        This function returns the list of the names of the models with the
+        given parameters.  The first name is the canonical name of the
+        parameter set, the others are aliases.
+        """
+        key = _params_key(width, poly, reflect_in, xor_in, reflect_out, xor_out)
+        return list(self._by_params.get(key, ()))
+
+
+    def names_by_check(self, width, check):
+        """
+        This function returns the list of the names of the models of the given
+        width whose CRC of the string "123456789" is check.
         """
-        model = model.lower()
-        for i in self.models:
-            if i['name'] == model:
-                return i
-        return None
+        return list(self._by_check.get((width, check), ()))
@@ -0,0 +1,246 @@
+#  pycrc -- parameterisable CRC calculation utility and C source code generator
+#
+#  Copyright (c) 2006-2017  Thomas Pircher  <tehpeh-web@tty1.net>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+
+
+"""
+Native backend for the table-driven algorithm.
+
+The C source code for a fully defined model is generated with pycrc.codegen,
+compiled into a shared object with the system C compiler and loaded with
+ctypes.  The shared objects are cached on disk, see cache_dir().  If no
+compiler is available, load() returns None and the pure Python
+implementation is used instead.
+
+This backend is used by the Crc objects created with backend='native':
+
+    from pycrc.algorithms import Crc
+
+    crc = Crc(width = 32, poly = 0x04c11db7,
+            reflect_in = True, xor_in = 0xffffffff,
+            reflect_out = True, xor_out = 0xffffffff,
+            backend = 'native')
+    crc_hash = crc.new(b"123456789")
+    print("{0:s}: {1:s}".format(crc.get_backend().name, crc_hash.hexdigest()))
+"""
+
+import ctypes
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+from pycrc import progname, version, url
+from pycrc.opt import Options
+from pycrc.tablestore import cache_dir
+import pycrc.codegen as cg
+
+
+# The generated crc_init() and crc_finalize() functions are static inline and
+# crc_t depends on the width; export all three functions with a fixed type.
+_wrapper_src = """
+uint64_t pycrc_native_init(void);
+uint64_t pycrc_native_update(uint64_t crc, const void *data, size_t data_len);
+uint64_t pycrc_native_finalize(uint64_t crc);
+
+uint64_t pycrc_native_init(void)
+{
+    return crc_init();
+}
+
+uint64_t pycrc_native_update(uint64_t crc, const void *data, size_t data_len)
+{
+    return crc_update((crc_t)crc, data, data_len);
+}
+
+uint64_t pycrc_native_finalize(uint64_t crc)
+{
+    return crc_finalize((crc_t)crc);
+}
+"""
+
+_cflags = ['-O2', '-fPIC', '-shared']
+
+# Backends loaded by this process, indexed by the cache key.
+_loaded = {}
+
+
+class NativeBackend(object):
+    """
+    The table-driven algorithm of a compiled shared object.
+    The methods of this class have the same signature as the ones of
+    pycrc.algorithms.PythonBackend.
+    """
+    name = 'native'
+
+    def __init__(self, filename):
+        lib = ctypes.CDLL(filename)
+        self._init = lib.pycrc_native_init
+        self._init.argtypes = []
+        self._init.restype = ctypes.c_uint64
+        self._update = lib.pycrc_native_update
+        self._update.argtypes = [ctypes.c_uint64, ctypes.c_void_p, ctypes.c_size_t]
+        self._update.restype = ctypes.c_uint64
+        self._finalize = lib.pycrc_native_finalize
+        self._finalize.argtypes = [ctypes.c_uint64]
+        self._finalize.restype = ctypes.c_uint64
+
+    def init(self):
+        """
+        Return the initial register value.
+        """
+        return self._init()
+
+    def update(self, reg, in_data):
+        """
+        Feed the bytes in in_data into the register and return the updated
+        register.
+        """
+        if not isinstance(in_data, (bytes, bytearray, memoryview)):
+            in_data = bytes(bytearray(in_data))
+        if isinstance(in_data, bytes):
+            return self._update(reg, in_data, len(in_data))
+        # Writable buffers, such as the blocks of pycrc.files.file_blocks(),
+        # are passed by address; only read-only ones are copied.
+        view = memoryview(in_data)
+        size = len(view) * view.itemsize
+        if not view.readonly:
+            try:
+                buf = (ctypes.c_char * size).from_buffer(in_data)
+            except TypeError:
+                # Python 2 can't pass a memoryview to from_buffer().
+                pass
+            else:
+                return self._update(reg, buf, size)
+        return self._update(reg, view.tobytes(), size)
+
+    def finalize(self, reg):
+        """
+        Return the final CRC value from the register.
+        """
+        return self._finalize(reg)
+
+
+def _compiler():
+    """
+    Return the C compiler command.
+    """
+    return os.environ.get('CC', 'cc')
+
+
+def _cache_key(crc, slice_by):
+    """
+    Return a string which identifies the shared object for the parameters of
+    crc, the version of pycrc and the compiler command.
+    """
+    key = repr((version, crc.width, crc.poly, crc.reflect_in, crc.xor_in,
+                crc.reflect_out, crc.xor_out, slice_by, _compiler(), _cflags))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _slice_by(crc):
+    """
+    Return the slice-by parameter of the generated code for the parameters of
+    crc, or 1 if the code generator does not support slice-by for them.
+    """
+    if crc.width >= 8:
+        return 8
+    return 1
+
+
+def _generate(crc, slice_by, action, filename):
+    """
+    Generate the C header or source file for the parameters of crc.
+    """
+    argv = [
+        '--width', str(crc.width), '--poly', '{0:#x}'.format(crc.poly),
+        '--reflect-in', str(crc.reflect_in), '--xor-in', '{0:#x}'.format(crc.xor_in),
+        '--reflect-out', str(crc.reflect_out), '--xor-out', '{0:#x}'.format(crc.xor_out),
+        '--force-poly', '--algorithm', 'table-driven', '--std', 'C99',
+        '--generate', action, '-o', filename]
+    if slice_by > 1:
+        argv += ['--slice-by', str(slice_by)]
+    opt = Options(progname, version, url)
+    opt.parse(argv)
+    return str(cg.File(opt, ''))
+
+
+def _build(crc, slice_by, filename):
+    """
+    Generate the C code for the parameters of crc and compile it into the
+    shared object filename.  Return False if the compilation failed.
+    """
+    build_dir = tempfile.mkdtemp(prefix='pycrc.')
+    try:
+        header = os.path.join(build_dir, 'crc.h')
+        source = os.path.join(build_dir, 'crc.c')
+        with open(header, 'w') as out_file:
+            out_file.write(_generate(crc, slice_by, 'h', header))
+        with open(source, 'w') as out_file:
+            out_file.write(_generate(crc, slice_by, 'c', source))
+            out_file.write(_wrapper_src)
+        shared_object = os.path.join(build_dir, 'crc.so')
+        cmd = [_compiler()] + _cflags + ['-o', shared_object, source]
+        with open(os.devnull, 'w') as devnull:
+            if subprocess.call(cmd, stdout=devnull, stderr=devnull) != 0:
+                return False
+        # Rename atomically, other processes may be building the same file.
+        shutil.move(shared_object, filename + '.tmp{0:d}'.format(os.getpid()))
+        os.rename(filename + '.tmp{0:d}'.format(os.getpid()), filename)
+        return True
+    except (IOError, OSError):
+        return False
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+
+def load(crc, directory=None):
+    """
+    Return a NativeBackend for the parameters of the Crc object crc, or None
+    if the width is greater than 64 or if the code cannot be compiled.
+
+    The shared object is taken from the directory (default: cache_dir()) if it
+    has been built before, otherwise it is compiled and stored there.
+    """
+    if crc.width > 64:
+        return None
+    slice_by = _slice_by(crc)
+    key = _cache_key(crc, slice_by)
+    if key in _loaded:
+        return _loaded[key]
+
+    if directory is None:
+        directory = cache_dir()
+    filename = os.path.join(directory, 'native-{0:s}.so'.format(key))
+    if not os.path.isfile(filename):
+        try:
+            os.makedirs(directory)
+        except OSError:
+            if not os.path.isdir(directory):
+                return None
+        if not _build(crc, slice_by, filename):
+            return None
+    try:
+        backend = NativeBackend(filename)
+    except (OSError, AttributeError):
+        return None
+    _loaded[key] = backend
+    return backend
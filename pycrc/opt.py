@@ -56,6 +56,10 @@ class Options(object):
     action_generate_c = 0x05
     action_generate_c_main = 0x06
     action_generate_table = 0x07
+    action_identify = 0x08
+    action_search = 0x09
+    action_solve_xor = 0x0a
+    action_benchmark = 0x0b
 
 
     def __init__(self, progname='pycrc', version=None, url=None):
@@ -73,8 +77,15 @@ class Options(object):
         self.tbl_idx_width = 8
         self.tbl_width = 1 << self.tbl_idx_width
         self.slice_by = 1
+        self.clmul = False
+        self.dispatch = False
+        self.streams = 1
+        self.combine = False
         self.verbose = False
         self.check_string = "123456789"
+        self.identify_samples = []
+        self.search_samples = []
+        self.solve_xor_samples = []
         self.msb_mask = None
         self.mask = None
 
@@ -85,6 +96,9 @@ class Options(object):
         self.output_file = None
         self.action = self.action_check_str
         self.check_file = None
+        self.benchmark_baseline = None
+        self.benchmark_threshold = 10.0
+        self.jobs = 1
         self.c_std = None
         self.undefined_crc_parameters = False
 
@@ -104,6 +118,22 @@ To calculate the checksum of a string or hexadecimal data:
 To calculate the checksum of a file:
     python %prog [model] --check-file filename
 
+To find the models matching hexadecimal messages followed by their CRC:
+    python %prog --identify "3132333435363738392639f4cb" [--identify ...]
+
+To find the parameters of a CRC of a given width from hexadecimal messages
+followed by their CRC:
+    python %prog --width 16 --search "313233343536373839bb3d" --search ...
+
+To calculate the XorIn and XorOut values of a CRC with known Width, Poly and
+reflection from messages of different lengths followed by their CRC:
+    python %prog --width 16 --poly 0x8005 --reflect-in 1 --reflect-out 1 \\
+            --solve-xor "313233343536373839bb3d" --solve-xor "707963726300cc"
+
+To measure the throughput of the Python implementation, save the results as
+JSON file and compare them with the results of an earlier run:
+    python %prog [model] --benchmark -o new.json --benchmark-baseline old.json
+
 To generate the C source code and write it to filename:
     python %prog [model] --generate c -o filename
 
@@ -134,6 +164,48 @@ of the following parameters:
                 action="store", type="string", dest="check_file",
                 help="calculate the checksum of a file",
                 metavar="FILE")
+        parser.add_option(
+                "--identify",
+                action="append", type="string", dest="identify",
+                help="find the models which match the hexadecimal STRING, "
+                     "a message followed by its CRC; can be given more than once",
+                metavar="STRING")
+        parser.add_option(
+                "--search",
+                action="append", type="string", dest="search",
+                help="find the parameters of the CRC of the width given with --width from the "
+                     "hexadecimal STRING, a message followed by its CRC; "
+                     "give it more than once with messages of different lengths",
+                metavar="STRING")
+        parser.add_option(
+                "--solve-xor",
+                action="append", type="string", dest="solve_xor",
+                help="calculate XorIn and XorOut of the CRC given with --width, --poly, "
+                     "--reflect-in and --reflect-out from the hexadecimal STRING, "
+                     "a message followed by its CRC; "
+                     "give it more than once with messages of different lengths",
+                metavar="STRING")
+        parser.add_option(
+                "--benchmark",
+                action="store_true", dest="benchmark", default=False,
+                help="measure the throughput of the Python algorithms for the given model "
+                     "or for a set of models; write the results as JSON to the output file")
+        parser.add_option(
+                "--benchmark-baseline",
+                action="store", type="string", dest="benchmark_baseline",
+                help="compare the benchmark results with the JSON FILE of an earlier run",
+                metavar="FILE")
+        parser.add_option(
+                "--benchmark-threshold",
+                action="store", type="float", dest="benchmark_threshold", default=10.0,
+                help="report a regression if the throughput dropped by more than PERCENT "
+                     "(default: 10)",
+                metavar="PERCENT")
+        parser.add_option(
+                "--jobs",
+                action="store", type="int", dest="jobs", default=1,
+                help="calculate the checksum of a file with NUM parallel processes",
+                metavar="NUM")
         parser.add_option(
                 "--generate",
                 action="store", type="string", dest="generate", default=None,
@@ -148,7 +220,7 @@ of the following parameters:
                 "--algorithm",
                 action="store", type="string", dest="algorithm", default="all",
                 help="choose an algorithm from "
-                "{bit-by-bit, bbb, bit-by-bit-fast, bbf, table-driven, tbl, all}",
+                "{bit-by-bit, bbb, bit-by-bit-fast, bbf, table-driven, tbl, clmul, dispatch, all}",
                 metavar="ALGO")
         parser.add_option(
                 "--model",
@@ -190,10 +262,21 @@ of the following parameters:
                 action="store", type="int", dest="slice_by",
                 help="read NUM bytes at a time from the input. NUM must be one of the values {4, 8, 16}",
                 metavar="NUM")
+        parser.add_option(
+                "--streams",
+                action="store", type="int", dest="streams",
+                help="update NUM interleaved registers over separate regions of the input. "
+                     "NUM must be one of the values {2, 3, 4}",
+                metavar="NUM")
+        parser.add_option(
+                "--combine",
+                action="store_true", dest="combine", default=False,
+                help="when generating source code, add the functions shift_zeros() and combine() "
+                     "to extend a CRC with zero bytes and to combine the CRCs of two messages")
         parser.add_option(
                 "--table-idx-width",
                 action="store", type="int", dest="table_idx_width",
-                help="use NUM bits to index the CRC table; NUM must be one of the values {1, 2, 4, 8}",
+                help="use NUM bits to index the CRC table; NUM must be one of the values {1, 2, 4, 8, 16}",
                 metavar="NUM")
         parser.add_option(
                 "--force-poly",
@@ -259,7 +342,7 @@ of the following parameters:
             undefined_params.append("--xor-out")
 
         if options.table_idx_width != None:
-            if options.table_idx_width in set((1, 2, 4, 8)):
+            if options.table_idx_width in set((1, 2, 4, 8, 16)):
                 self.tbl_idx_width = options.table_idx_width
                 self.tbl_width = 1 << options.table_idx_width
             else:
@@ -304,24 +387,9 @@ of the following parameters:
                 self.__error("slice-by is only implemented for fully defined models")
             if self.tbl_idx_width != 8:
                 self.__error("slice-by is only implemented for table-idx-width=8")
-            # FIXME tp: Fix corner cases and disable the following tests
-            if self.width < 8:
-                self.__warning("disabling slice-by for width {0}".format(self.width))
-                self.slice_by = 1
-            if self.width < 16:
+            if self.width < 8 or self.width > 64:
                 self.__warning("disabling slice-by for width {0}".format(self.width))
                 self.slice_by = 1
-            if self.width > 32:
-                self.__warning("disabling slice-by for width {0}".format(self.width))
-                self.slice_by = 1
-            if not self.reflect_in:
-                self.__warning("disabling slice-by for non-reflected algorithm")
-                self.slice_by = 1
-# FIXME tp: reintroduce this?
-#            if self.width % 8 != 0:
-#                self.__error("slice-by is only implemented for width multiples of 8")
-#            if options.slice_by < self.width / 8:
-#                self.__error("slice-by must be greater or equal width / 8")
             if self.c_std == "C89":
                 self.__error("--slice-by not supported for C89")
 
@@ -333,9 +401,63 @@ of the following parameters:
                 self.algorithm |= self.algo_bit_by_bit_fast
             if alg in set(["table-driven", "tbl", "all"]):
                 self.algorithm |= self.algo_table_driven
+            if alg == "clmul":
+                self.algorithm |= self.algo_table_driven
+                self.clmul = True
+            if alg == "dispatch":
+                self.algorithm |= self.algo_table_driven
+                self.dispatch = True
             if self.algorithm == 0:
                 self.__error("unknown algorithm {0:s}".format(options.algorithm))
 
+        if self.clmul:
+            if self.undefined_crc_parameters:
+                self.__error("clmul is only implemented for fully defined models")
+            if self.width > 64:
+                self.__error("clmul is only implemented for widths up to 64")
+            if self.tbl_idx_width != 8:
+                self.__error("clmul is only implemented for table-idx-width=8")
+            if self.slice_by > 1:
+                self.__error("clmul and --slice-by can't be combined")
+            if self.c_std == "C89":
+                self.__error("clmul not supported for C89")
+
+        if options.streams != None:
+            if options.streams in set((2, 3, 4)):
+                self.streams = options.streams
+            else:
+                self.__error("unsupported number of streams {0:d}".format(options.streams))
+            if self.undefined_crc_parameters:
+                self.__error("--streams is only implemented for fully defined models")
+            if self.tbl_idx_width != 8:
+                self.__error("--streams is only implemented for table-idx-width=8")
+            if self.clmul or self.dispatch:
+                self.__error("--streams can't be combined with the clmul or dispatch algorithm")
+
+        if options.combine:
+            if self.undefined_crc_parameters:
+                self.__error("--combine is only implemented for fully defined models")
+            self.combine = True
+
+        if self.dispatch:
+            if self.undefined_crc_parameters:
+                self.__error("dispatch is only implemented for fully defined models")
+            if self.width > 64:
+                self.__error("dispatch is only implemented for widths up to 64")
+            if self.tbl_idx_width != 8:
+                self.__error("dispatch is only implemented for table-idx-width=8")
+            if self.slice_by > 1:
+                self.__error("dispatch and --slice-by can't be combined")
+            if self.c_std == "C89":
+                self.__error("dispatch not supported for C89")
+            # the slice-by-8 variant shares its tables with the table variant
+            if self.width >= 8:
+                self.slice_by = 8
+
+        if options.jobs < 1:
+            self.__error("the number of jobs must be at least 1")
+        self.jobs = options.jobs
+
         if options.symbol_prefix != None:
             self.symbol_prefix = options.symbol_prefix
         if options.include_files != None:
@@ -357,6 +479,32 @@ of the following parameters:
             self.action = self.action_check_file
             self.check_file = options.check_file
             op_count += 1
+        if options.identify != None:
+            self.action = self.action_identify
+            self.identify_samples = options.identify
+            op_count += 1
+        if options.search != None:
+            self.action = self.action_search
+            self.search_samples = options.search
+            if self.width is None:
+                self.__error("--search requires --width")
+            op_count += 1
+        if options.solve_xor != None:
+            self.action = self.action_solve_xor
+            self.solve_xor_samples = options.solve_xor
+            if self.width is None or self.poly is None or self.reflect_in is None or self.reflect_out is None:
+                self.__error("--solve-xor requires --width, --poly, --reflect-in and --reflect-out")
+            op_count += 1
+        if options.benchmark:
+            self.action = self.action_benchmark
+            op_count += 1
+        if options.benchmark_baseline != None:
+            if not options.benchmark:
+                self.__error("--benchmark-baseline requires --benchmark")
+            self.benchmark_baseline = options.benchmark_baseline
+        if options.benchmark_threshold <= 0:
+            self.__error("the benchmark threshold must be positive")
+        self.benchmark_threshold = options.benchmark_threshold
         if options.generate != None:
             arg = options.generate.lower()
             if arg == 'h':
@@ -379,12 +527,15 @@ of the following parameters:
             elif self.algorithm not in set(
                     [self.algo_bit_by_bit, self.algo_bit_by_bit_fast, self.algo_table_driven]):
                 self.__error("select an algorithm to be used in the generated file")
+            if self.tbl_idx_width == 16:
+                self.__error("table-idx-width 16 is only supported "
+                    "for internal CRC calculation")
         else:
-            if self.tbl_idx_width != 8:
+            if self.tbl_idx_width not in set((8, 16)):
                 self.__warning("reverting to Table Index Width = 8 "
                     "for internal CRC calculation")
                 self.tbl_idx_width = 8
-                self.tbl_width = 1 << options.table_idx_width
+                self.tbl_width = 1 << self.tbl_idx_width
         if op_count == 0:
             self.action = self.action_check_str
         if op_count > 1:
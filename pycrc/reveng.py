@@ -0,0 +1,294 @@
+#  pycrc -- parameterisable CRC calculation utility and C source code generator
+#
+#  Copyright (c) 2006-2017  Thomas Pircher  <tehpeh-web@tty1.net>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+
+
+"""
+Recover the CRC model of sample data.
+
+To find the models in pycrc.models which match a set of samples, where each
+sample is a message followed by its CRC, stored in either byte order:
+
+    from pycrc.reveng import identify
+
+    samples = [bytearray(b'123456789\x26\x39\xf4\xcb')]
+    for name, byteorder in identify(samples):
+        print("{0:s} ({1:s}-endian)".format(name, byteorder))
+
+To recover the parameters of an unknown CRC of a given width from a few
+(message, crc) samples, in the style of RevEng:
+
+    from pycrc.reveng import search
+
+    samples = [(b'123456789', 0xcbf43926), (b'abcdefghi', 0x8da988af),
+               (b'ABCDEFGHI', 0xc96b9640), (b'pycrc', 0xaae4a62b)]
+    for params in search(samples, 32):
+        print("poly = {poly:#x}, xor_in = {xor_in:#x}, xor_out = {xor_out:#x}".format(**params))
+"""
+
+import binascii
+from collections import OrderedDict
+import multiprocessing
+from pycrc.algorithms import Crc, reflect_octets, solve_xor
+from pycrc.models import CrcModels
+
+
+def _stored_crcs(sample, width):
+    """
+    Split a sample into the message and a dict of the possible CRC values,
+    indexed by their byte order.  A sample is either a tuple (message, crc),
+    where the byte order of crc is unknown (None), or a message followed by
+    its CRC in (width + 7) // 8 octets.  Return None if the sample is too
+    short.
+    """
+    if isinstance(sample, tuple):
+        message, crc = sample
+        return message, {None: crc}
+    num_bytes = (width + 7) // 8
+    if len(sample) < num_bytes:
+        return None
+    message = sample[:len(sample) - num_bytes]
+    stored = bytearray(sample[len(sample) - num_bytes:])
+    crc_big = 0
+    crc_little = 0
+    for i in range(num_bytes):
+        crc_big = (crc_big << 8) | stored[i]
+        crc_little = (crc_little << 8) | stored[num_bytes - 1 - i]
+    if num_bytes == 1:
+        return message, {'big': crc_big}
+    return message, {'big': crc_big, 'little': crc_little}
+
+
+def identify(samples, models=None):
+    """
+    Return the list of (name, byteorder) of the models that match all
+    samples.  byteorder is 'big' or 'little' for the order of the stored CRC
+    octets, or None if the CRCs were given as integers.
+
+    samples is a list of messages followed by their CRC, or of (message, crc)
+    tuples (see _stored_crcs()).  models is a list of model parameters as in
+    CrcModels.models; the default is all known models.
+
+    The models are grouped by width, poly and reflect_in, so that each sample
+    is passed once through the table-driven algorithm per group.  The CRC is
+    affine in the initial register value, so the CRC of a sample for any
+    xor_in is calculated from the register of the all-zero initial value in
+    O(log(len)) steps.
+    """
+    if models is None:
+        models = CrcModels().models
+    groups = OrderedDict()
+    for model in models:
+        groups.setdefault((model['width'], model['poly'], model['reflect_in']), []).append(model)
+
+    result = []
+    for (width, poly, reflect_in), group in groups.items():
+        crc = Crc(width=width, poly=poly, reflect_in=reflect_in, xor_in=0, reflect_out=False, xor_out=0)
+        registers = []
+        for sample in samples:
+            split = _stored_crcs(sample, width)
+            if split is None:
+                break
+            message, stored = split
+            registers.append((len(message), crc.new(message).intdigest(), stored))
+        else:
+            for model in group:
+                byteorders = None
+                for length, reg, stored in registers:
+                    reg ^= crc.extend_zeros(model['xor_in'], length)
+                    if model['reflect_out']:
+                        reg = crc.reflect(reg, width)
+                    reg ^= model['xor_out']
+                    matches = set(k for k, v in stored.items() if v == reg)
+                    byteorders = matches if byteorders is None else byteorders & matches
+                    if not byteorders:
+                        break
+                for byteorder in sorted(byteorders or (), key=str):
+                    result.append((model['name'], byteorder))
+    return result
+
+
+def _gf2_mod(a, b):
+    """
+    Return the remainder of the GF(2) polynomial division a / b.
+    """
+    b_len = b.bit_length()
+    shift = a.bit_length() - b_len
+    while shift >= 0:
+        a ^= b << shift
+        shift = a.bit_length() - b_len
+    return a
+
+
+def _gf2_divmod(a, b):
+    """
+    Return the quotient and the remainder of the GF(2) polynomial division
+    a / b.
+    """
+    b_len = b.bit_length()
+    quotient = 0
+    shift = a.bit_length() - b_len
+    while shift >= 0:
+        quotient |= 1 << shift
+        a ^= b << shift
+        shift = a.bit_length() - b_len
+    return quotient, a
+
+
+def _gf2_gcd(a, b):
+    """
+    Return the greatest common divisor of the GF(2) polynomials a and b.
+    """
+    while b:
+        a, b = b, _gf2_mod(a, b)
+    return a
+
+
+def _message_poly(message, reflect_in):
+    """
+    Return the message as GF(2) polynomial, the first bit having the highest
+    degree.
+    """
+    if reflect_in:
+        message = reflect_octets(message)
+    if len(message) == 0:
+        return 0
+    return int(binascii.hexlify(bytes(bytearray(message))), 16)
+
+
+def _search_divisors(args):
+    """
+    Return the odd divisors of degree width of the polynomial gcd, found by
+    trying all odd polynomials of degree (by_cofactor ? deg(gcd) - width :
+    width) with the lower bits start..stop-1.  This is the worker function of
+    _poly_candidates().
+    """
+    gcd, width, by_cofactor, start, stop = args
+    degree = gcd.bit_length() - 1
+    top = 1 << (degree - width if by_cofactor else width)
+    result = []
+    for low in range(start | 1, stop, 2):
+        quotient, remainder = _gf2_divmod(gcd, top | low)
+        if remainder == 0:
+            divisor = quotient if by_cofactor else top | low
+            if divisor.bit_length() == width + 1:
+                result.append(divisor)
+    return result
+
+
+def _poly_candidates(gcd, width, jobs, max_candidates):
+    """
+    Return the sorted list of the polynomials (without the leading x^width
+    term) of the odd divisors of degree width of gcd.  Raise ValueError if
+    more than max_candidates polynomials would have to be tried.
+    """
+    # The divisors are odd, remove the factors x from gcd.
+    while gcd & 1 == 0:
+        gcd >>= 1
+    degree = gcd.bit_length() - 1
+    if degree < width:
+        return []
+    if degree == width:
+        return [gcd ^ (1 << width)]
+
+    # Try the cofactors or the divisors, whichever are fewer.
+    by_cofactor = degree - width < width
+    count = 1 << (degree - width if by_cofactor else width)
+    if count > max_candidates:
+        raise ValueError("too many candidate polynomials; "
+                         "add more samples of the same length")
+    chunks = jobs * 4 if jobs > 1 and count > 1 << 16 else 1
+    chunk_size = (count + chunks - 1) // chunks
+    # Chunks start at even values, so that start | 1 does not skip a candidate.
+    chunk_size += chunk_size & 1
+    args = [(gcd, width, by_cofactor, start, min(start + chunk_size, count))
+            for start in range(0, count, chunk_size)]
+    if len(args) > 1:
+        pool = multiprocessing.Pool(jobs)
+        try:
+            divisors = pool.map(_search_divisors, args)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        divisors = [_search_divisors(arg) for arg in args]
+    return sorted(set(divisor ^ (1 << width) for chunk in divisors for divisor in chunk))
+
+
+def search(samples, width, poly=None, reflect_in=None, reflect_out=None, jobs=1,
+           max_candidates=1 << 24, max_solutions=256):
+    """
+    Return the list of all parameter sets of the given width which are
+    consistent with the samples, a list of (message, crc) tuples.  Each
+    result is a dict with the keys of the models in pycrc.models; the name is
+    the name of the matching model or None.  Raise ValueError if the
+    samples do not determine the parameters.
+
+    poly, reflect_in and reflect_out restrict the search if they are given.
+    Otherwise the polynomial is the divisor of degree width of the greatest
+    common divisor of M(x) * x^width + C(x) over the pairs of samples of
+    equal length, where M is the difference of the messages and C is the
+    difference of the CRCs; xor_in and xor_out cancel out in the differences.
+    If the GCD has a higher degree, up to max_candidates divisors or
+    cofactors are tried with jobs processes.  xor_in and xor_out are then
+    solved as a linear system, which needs samples of at least two different
+    lengths.
+    """
+    models = CrcModels()
+    samples = [(bytearray(message), crc) for message, crc in samples]
+    result = []
+    for ref_in in [reflect_in] if reflect_in is not None else [False, True]:
+        for ref_out in [reflect_out] if reflect_out is not None else [False, True]:
+            if poly is not None:
+                polys = [poly]
+            else:
+                by_length = OrderedDict()
+                for message, crc in samples:
+                    if ref_out:
+                        crc = Crc(width, 1, False, 0, False, 0).reflect(crc, width)
+                    by_length.setdefault(len(message), []).append(
+                        (_message_poly(message, ref_in) << width) ^ crc)
+                gcd = 0
+                for sample_polys in by_length.values():
+                    for sample_poly in sample_polys[1:]:
+                        gcd = _gf2_gcd(gcd, sample_poly ^ sample_polys[0])
+                if gcd == 0:
+                    raise ValueError("at least two different samples of the same length are needed")
+                polys = _poly_candidates(gcd, width, jobs, max_candidates)
+
+            for candidate in polys:
+                for xor_in, xor_out in solve_xor(width, candidate, ref_in, ref_out, samples, max_solutions):
+                    crc = Crc(width=width, poly=candidate, reflect_in=ref_in, xor_in=xor_in,
+                              reflect_out=ref_out, xor_out=xor_out)
+                    if any(crc.new(message).intdigest() != value for message, value in samples):
+                        continue
+                    names = models.names_by_params(width, candidate, ref_in, xor_in, ref_out, xor_out)
+                    result.append({
+                        'name':         names[0] if names else None,
+                        'width':        width,
+                        'poly':         candidate,
+                        'reflect_in':   ref_in,
+                        'xor_in':       xor_in,
+                        'reflect_out':  ref_out,
+                        'xor_out':      xor_out,
+                        'check':        crc.table_driven('123456789'),
+                        })
+    return result
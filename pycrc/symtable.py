@@ -104,9 +104,21 @@ class SymbolTable(collections.MutableMapping):
             'crc_init_function': lambda: self.opt.symbol_prefix + 'init',
             'crc_update_function': lambda: self.opt.symbol_prefix + 'update',
             'crc_finalize_function': lambda: self.opt.symbol_prefix + 'finalize',
+            'crc_shift_zeros_function': lambda: self.opt.symbol_prefix + 'shift_zeros',
+            'crc_combine_function': lambda: self.opt.symbol_prefix + 'combine',
 
             'crc_init_value': lambda: _get_init_value(self.opt),
             'crc_table_init': lambda: _get_table_init(self.opt),
+            'crc_shift_long': lambda: str(_crc_shift_long),
+            'crc_shift_short': lambda: str(_crc_shift_short),
+            'crc_shift_long_table_init': lambda: _get_shift_table_init(self.opt, _crc_shift_long),
+            'crc_shift_short_table_init': lambda: _get_shift_table_init(self.opt, _crc_shift_short),
+            'crc_stream_block': lambda: str(_crc_stream_block),
+            'crc_stream_shift_table_init': lambda: _get_shift_table_init(self.opt, _crc_stream_block),
+            'crc_combine_poly': lambda: _pretty_hex(_get_combine_poly(self.opt), self.opt.width),
+            'crc_combine_xor': lambda: _pretty_hex(_get_combine_xor(self.opt), self.opt.width),
+            'crc_zeros_operators': lambda: str(_crc_zeros_operators),
+            'crc_zeros_operator_table_init': lambda: _get_zeros_operator_table_init(self.opt),
         })
 
     def __getitem__(self, key):
@@ -286,11 +298,11 @@ def _get_simple_table(opt, crc_tbl, values_per_line, format_width, indent):
     line breaks.
     """
     out = ""
-    for i in range(opt.tbl_width):
+    for i in range(len(crc_tbl)):
         if i % values_per_line == 0:
             out += " " * indent
         tbl_val = _pretty_hex(crc_tbl[i], format_width)
-        if i == (opt.tbl_width - 1):
+        if i == (len(crc_tbl) - 1):
             out += "{0:s}".format(tbl_val)
         elif i % values_per_line == (values_per_line - 1):
             out += "{0:s},\n".format(tbl_val)
@@ -338,6 +350,118 @@ def _get_table_init(opt):       # TODO: change to return a list
     return '{\n' + out + '\n}'
 
 
+# The lengths of the blocks of the three interleaved streams of the crc32
+# instruction.
+_crc_shift_long = 8192
+_crc_shift_short = 256
+
+# The length of the blocks of the interleaved streams of the table-driven
+# algorithm.
+_crc_stream_block = 256
+
+
+def _zeros_crc(opt, reflect):
+    """
+    Return a Crc object without final xor whose extend_zeros() feeds zero
+    octets into a register in the bit order given by reflect.
+    """
+    return Crc(width=opt.width, poly=opt.poly, reflect_in=reflect, xor_in=0,
+               reflect_out=reflect, xor_out=0)
+
+
+def _get_shift_table_init(opt, length):
+    """
+    Return the tables which feed length zero octets into the register of the
+    table-driven algorithm: the k-th table gives the register for the octet
+    value i in the k-th octet of the register.
+    """
+    if opt.width is None or opt.poly is None or opt.reflect_in is None:
+        return "0"
+    # The register of the table-driven algorithm is reflected for reflected
+    # models, as is the final CRC value of a model with reflect_out.
+    crc = _zeros_crc(opt, opt.reflect_in)
+    # The operator is linear: calculate the columns and xor them together.
+    columns = [crc.extend_zeros(1 << i, length) for i in range(opt.width)]
+    tables = []
+    for k in range((opt.width + 7) // 8):
+        tbl = [0] * 256
+        for i in range(1, 256):
+            low_bit = (i & -i).bit_length() - 1
+            if 8 * k + low_bit < opt.width:
+                tbl[i] = tbl[i & (i - 1)] ^ columns[8 * k + low_bit]
+            else:
+                tbl[i] = tbl[i & (i - 1)]
+        tables.append(tbl)
+    if opt.width > 32:
+        values_per_line = 4
+    elif opt.width >= 16:
+        values_per_line = 8
+    else:
+        values_per_line = 16
+    out = [_get_simple_table(opt, tbl, values_per_line, max(opt.width, 8), 8) for tbl in tables]
+    return '{\n    {\n' + '\n    },\n    {\n'.join(out) + '\n    }\n}'
+
+
+# The number of operators which feed 2^k zero octets into the CRC, enough for
+# lengths of up to 64 bits.
+_crc_zeros_operators = 64
+
+
+def _reflect_out(opt, value):
+    """
+    Return the value in the bit order of the final CRC value: reflected if
+    the model reflects the output.
+    """
+    if opt.reflect_out:
+        return int('{0:0{1:d}b}'.format(value, opt.width)[::-1], 2)
+    return value
+
+
+def _get_combine_poly(opt):
+    """
+    Return the polynomial in the bit order of the final CRC value, or None if
+    the model is not fully defined.
+    """
+    if opt.undefined_crc_parameters:
+        return None
+    return _reflect_out(opt, opt.poly)
+
+
+def _get_combine_xor(opt):
+    """
+    Return the value which is xor-ed to the first CRC value when two CRC
+    values are combined: the final xor value and the initial value of the
+    register, which cancels the initial value of the second message.  None
+    if the model is not fully defined.
+    """
+    if opt.undefined_crc_parameters:
+        return None
+    crc = Crc(width=opt.width, poly=opt.poly,
+              reflect_in=opt.reflect_in, xor_in=opt.xor_in,
+              reflect_out=opt.reflect_out, xor_out=opt.xor_out)
+    return opt.xor_out ^ _reflect_out(opt, crc.direct_init)
+
+
+def _get_zeros_operator_table_init(opt):
+    """
+    Return the table of the operators which feed 2^k zero octets into the
+    CRC: the polynomials x^(8 * 2^k) modulo the CRC polynomial, in the bit
+    order of the final CRC value.
+    """
+    if opt.undefined_crc_parameters:
+        return "0"
+    crc = _zeros_crc(opt, opt.reflect_out)
+    one = _reflect_out(opt, 1)
+    tbl = [crc.extend_zeros(one, 1 << k) for k in range(_crc_zeros_operators)]
+    if opt.width > 32:
+        values_per_line = 4
+    elif opt.width >= 16:
+        values_per_line = 8
+    else:
+        values_per_line = 16
+    return '{\n' + _get_simple_table(opt, tbl, values_per_line, max(opt.width, 8), 4) + '\n}'
+
+
 def _tbl_shift(opt):
     """
     Return the table shift value
@@ -0,0 +1,322 @@
+#  pycrc -- parameterisable CRC calculation utility and C source code generator
+#
+#  Copyright (c) 2006-2017  Thomas Pircher  <tehpeh-web@tty1.net>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+
+
+"""
+Persistent store for the tables of the table-driven algorithm.
+
+Tables are looked up in two places:
+  - the store of prebuilt tables for all models in pycrc.models, which is
+    generated with build_model_store() when pycrc is installed, and
+  - a cache directory for all other parameters (see cache_dir()), which is
+    filled by save() and limited in size by set_cache_size().  The least
+    recently used files are removed first.  The cache directory is disabled
+    unless a size is set with set_cache_size() or $PYCRC_TABLE_CACHE_SIZE.
+
+A store file is meant to be memory-mapped.  It starts with a header and an
+index, followed by the tables of all entries as little-endian integers of
+1, 2, 4 or a multiple of 8 octets.  The tables of an entry are stored in the
+order of the slice-by tables, so that an entry with 16 tables also serves
+slice-by 1, 4 and 8.
+
+    import pycrc.tablestore as ts
+
+    tbl = ts.load(32, 0x04c11db7, True, 8, 8)
+    if tbl is not None:
+        print("{0:#x}".format(tbl[0][1]))
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from pycrc import progname
+
+
+_magic = b'pycrctb1'
+_header = struct.Struct('<8sI')
+# width, reflect_in, table_idx_width, number of tables, entry size, poly size, offset
+_index_entry = struct.Struct('<HBBBBHQ')
+_formats = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+
+_model_store = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models.tbl')
+
+# Tables with fewer entries are built faster than they are looked up.
+_save_min_entries = 1024
+
+# The numbers of tables which are stored in the cache directory, one file
+# each, so that saving the tables for one slice-by parameter doesn't replace
+# those for another one.
+_cache_num_tables = (1, 2, 4, 8, 16)
+
+
+def _env_cache_size():
+    """
+    Return the size of the cache directory from $PYCRC_TABLE_CACHE_SIZE, or 0
+    if the variable is not set or not a number.
+    """
+    try:
+        return max(int(os.environ.get('PYCRC_TABLE_CACHE_SIZE', '0')), 0)
+    except ValueError:
+        return 0
+
+_cache_size = _env_cache_size()
+
+
+def cache_dir():
+    """
+    Return the directory where pycrc caches files across runs.
+    This is $PYCRC_CACHE_DIR if set, otherwise $XDG_CACHE_HOME/pycrc or
+    ~/.cache/pycrc.
+    """
+    path = os.environ.get('PYCRC_CACHE_DIR')
+    if not path:
+        path = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        path = os.path.join(path, progname)
+    return path
+
+
+def set_cache_size(size):
+    """
+    Set the maximum size in octets of the tables in the cache directory.
+    A size of 0, the default unless $PYCRC_TABLE_CACHE_SIZE is set, disables
+    the cache directory.
+    """
+    global _cache_size
+    _cache_size = size
+
+
+def _entry_size(width):
+    """
+    Return the number of octets used to store a table entry.
+    """
+    size = (width + 7) // 8
+    for entry_size in (1, 2, 4, 8):
+        if size <= entry_size:
+            return entry_size
+    return (size + 7) // 8 * 8
+
+
+def _to_bytes(value, size):
+    """
+    Return value as little-endian byte string of size octets.
+    """
+    return bytes(bytearray((value >> (8 * i)) & 0xff for i in range(size)))
+
+
+def _encode_table(tbl, entry_size):
+    """
+    Return the table as a byte string of little-endian integers.
+    """
+    if entry_size <= 8:
+        return struct.pack('<{0:d}{1:s}'.format(len(tbl), _formats[entry_size]), *tbl)
+    words = entry_size // 8
+    values = [(entry >> (64 * i)) & 0xffffffffffffffff for entry in tbl for i in range(words)]
+    return struct.pack('<{0:d}Q'.format(len(values)), *values)
+
+
+def _decode_table(buf, offset, length, entry_size):
+    """
+    Return the table of length entries at offset in buf as a tuple.
+    """
+    if entry_size <= 8:
+        return struct.unpack_from('<{0:d}{1:s}'.format(length, _formats[entry_size]), buf, offset)
+    words = entry_size // 8
+    values = struct.unpack_from('<{0:d}Q'.format(length * words), buf, offset)
+    tbl = []
+    for i in range(0, len(values), words):
+        entry = 0
+        for j in range(words):
+            entry |= values[i + j] << (64 * j)
+        tbl.append(entry)
+    return tuple(tbl)
+
+
+def write_tables(filename, entries):
+    """
+    Write a store file with the given entries.  Each entry is a tuple
+    ((width, poly, reflect_in, table_idx_width), tbl), where tbl is the list
+    of slice-by tables as returned by Crc.gen_table().
+    The file is replaced atomically.
+    """
+    index = []
+    data = []
+    offset = _header.size
+    for (dummy_width, poly, dummy_reflect_in, dummy_tbl_idx_width), dummy_tbl in entries:
+        offset += _index_entry.size + (poly.bit_length() + 7) // 8
+    for (width, poly, reflect_in, tbl_idx_width), tbl in entries:
+        entry_size = _entry_size(width)
+        poly_size = (poly.bit_length() + 7) // 8
+        index.append(_index_entry.pack(width, reflect_in, tbl_idx_width, len(tbl), entry_size, poly_size, offset) +
+                     _to_bytes(poly, poly_size))
+        for table in tbl:
+            data.append(_encode_table(table, entry_size))
+            offset += len(data[-1])
+
+    tmp_filename = '{0:s}.tmp{1:d}'.format(filename, os.getpid())
+    with open(tmp_filename, 'wb') as out_file:
+        out_file.write(_header.pack(_magic, len(index)))
+        for entry in index:
+            out_file.write(entry)
+        for table in data:
+            out_file.write(table)
+    os.rename(tmp_filename, filename)
+
+
+def read_table(filename, width, poly, reflect_in, tbl_idx_width, slice_by):
+    """
+    Return the first slice_by tables of the entry for the given parameters
+    in the store file filename, or None if the file has no such entry.
+    """
+    try:
+        with open(filename, 'rb') as in_file:
+            buf = mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (IOError, OSError, ValueError):
+        return None
+    try:
+        magic, count = _header.unpack_from(buf, 0)
+        if magic != _magic:
+            return None
+        pos = _header.size
+        for dummy_i in range(count):
+            e_width, e_reflect_in, e_tbl_idx_width, num_tables, entry_size, poly_size, offset = \
+                _index_entry.unpack_from(buf, pos)
+            pos += _index_entry.size
+            e_poly = buf[pos:pos + poly_size]
+            pos += poly_size
+            if (e_width, bool(e_reflect_in), e_tbl_idx_width) == (width, bool(reflect_in), tbl_idx_width) and \
+                    e_poly == _to_bytes(poly, poly_size) and num_tables >= slice_by:
+                length = 1 << tbl_idx_width
+                return tuple(_decode_table(buf, offset + i * length * entry_size, length, entry_size)
+                             for i in range(slice_by))
+        return None
+    except struct.error:
+        return None
+    finally:
+        buf.close()
+
+
+def _cache_filename(width, poly, reflect_in, tbl_idx_width, num_tables):
+    """
+    Return the name of the file for the given parameters and number of
+    tables in the cache directory.
+    """
+    key = repr((width, poly, bool(reflect_in), tbl_idx_width, num_tables))
+    return os.path.join(cache_dir(), 'tables', hashlib.sha1(key.encode('utf-8')).hexdigest() + '.tbl')
+
+
+def load(width, poly, reflect_in, tbl_idx_width, slice_by):
+    """
+    Return the slice_by tables for the given parameters from the prebuilt
+    model tables or from the cache directory, or None if they are not stored.
+    """
+    tbl = read_table(_model_store, width, poly, reflect_in, tbl_idx_width, slice_by)
+    if tbl is not None or _cache_size <= 0:
+        return tbl
+    # A file with more tables also serves fewer slices.
+    for num_tables in _cache_num_tables:
+        if num_tables < slice_by:
+            continue
+        filename = _cache_filename(width, poly, reflect_in, tbl_idx_width, num_tables)
+        tbl = read_table(filename, width, poly, reflect_in, tbl_idx_width, slice_by)
+        if tbl is not None:
+            try:
+                os.utime(filename, None)
+            except OSError:
+                pass
+            return tbl
+    return None
+
+
+def save(width, poly, reflect_in, tbl_idx_width, tbl):
+    """
+    Store the tables for the given parameters in the cache directory, if
+    they are large enough to be worth storing.  Errors are ignored.
+    """
+    if _cache_size <= 0 or len(tbl) * len(tbl[0]) < _save_min_entries:
+        return
+    filename = _cache_filename(width, poly, reflect_in, tbl_idx_width, len(tbl))
+    directory = os.path.dirname(filename)
+    try:
+        try:
+            os.makedirs(directory)
+        except OSError:
+            if not os.path.isdir(directory):
+                raise
+        write_tables(filename, [((width, poly, reflect_in, tbl_idx_width), tbl)])
+        _evict(directory)
+    except (IOError, OSError):
+        pass
+
+
+def _evict(directory):
+    """
+    Remove the least recently used files from the cache directory until the
+    total size is not greater than the cache size.
+    """
+    files = []
+    total = 0
+    for name in os.listdir(directory):
+        if name.endswith('.tbl'):
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+    files.sort()
+    for dummy_mtime, size, path in files:
+        if total <= _cache_size:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def build_model_store(filename):
+    """
+    Write the store of prebuilt tables for all models in pycrc.models.
+    Each model gets 16 slice-by tables with an index width of 8.  Nothing
+    but filename is written, the cache directory is not used.
+    """
+    # imported here, as pycrc.algorithms depends on this module.
+    from pycrc.algorithms import Crc
+    from pycrc.models import CrcModels
+    global _cache_size
+
+    entries = []
+    cache_size = _cache_size
+    _cache_size = 0
+    try:
+        for model in CrcModels().models:
+            key = (model['width'], model['poly'], model['reflect_in'], 8)
+            if key in set(k for k, dummy_tbl in entries):
+                continue
+            crc = Crc(width=model['width'], poly=model['poly'], reflect_in=model['reflect_in'],
+                      xor_in=0, reflect_out=False, xor_out=0, table_idx_width=8, slice_by=16)
+            entries.append((key, crc.gen_table()))
+    finally:
+        _cache_size = cache_size
+    write_tables(filename, entries)
@@ -1,7 +1,21 @@
 from distutils.core import setup
+from distutils.command.build_py import build_py
+import os
 
 from pycrc import progname, version, url
 
+
+class build_py_tables(build_py):
+    """
+    Build the package and the store of prebuilt tables for the CRC models.
+    """
+    def run(self):
+        build_py.run(self)
+        if not self.dry_run:
+            from pycrc.tablestore import build_model_store
+            build_model_store(os.path.join(self.build_lib, 'pycrc', 'models.tbl'))
+
+
 setup(name = 'pycrc',
         version = version,
         description = 'Free, easy to use Cyclic Redundancy Check source code generator for C/C++',
@@ -9,4 +23,5 @@ setup(name = 'pycrc',
         author_email = 'tehpeh-web@tty1.net',
         url = url,
         packages = ['pycrc'],
+        cmdclass = {'build_py': build_py_tables},
         )
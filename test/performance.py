@@ -0,0 +1,422 @@
+#!/usr/bin/env python
+# -*- coding: Latin-1 -*-
+
+#  pycrc performance test of the generated C code.
+#
+#  The C code of every combination of algorithm, table index width, slice-by
+#  and streams parameter is generated with pycrc.codegen for a set of models,
+#  compiled into one benchmark program per model and timed over a set of
+#  buffer sizes.  Each measurement is repeated and the median is reported.
+
+from __future__ import print_function
+from optparse import OptionParser
+import csv
+import os, sys
+import shlex
+import shutil
+import subprocess
+import tempfile
+sys.path.append('..')
+sys.path.append('.')
+from pycrc import progname, version, url
+from pycrc.models import CrcModels
+from pycrc.opt import Options as PycrcOptions
+import pycrc.codegen as cg
+
+
+# (name, algorithm, table index width, slice-by, streams)
+variants = [
+    ('bbb', 'bit-by-bit', None, None, None),
+    ('bbf', 'bit-by-bit-fast', None, None, None),
+    ('tbl1', 'table-driven', 1, None, None),
+    ('tbl2', 'table-driven', 2, None, None),
+    ('tbl4', 'table-driven', 4, None, None),
+    ('tbl8', 'table-driven', 8, None, None),
+    ('tbl8s2', 'table-driven', 8, None, 2),
+    ('tbl8s4', 'table-driven', 8, None, 4),
+    ('sb4', 'table-driven', 8, 4, None),
+    ('sb8', 'table-driven', 8, 8, None),
+    ('sb8s2', 'table-driven', 8, 8, 2),
+    ('sb8s3', 'table-driven', 8, 8, 3),
+    ('sb16', 'table-driven', 8, 16, None),
+    ('sb16s3', 'table-driven', 8, 16, 3),
+    ('clmul', 'clmul', 8, None, None),
+    ('dispatch', 'dispatch', 8, None, None),
+]
+
+columns = ['model', 'width', 'reflect_in', 'variant', 'algorithm', 'table_idx_width', 'slice_by',
+           'streams', 'size', 'iterations', 'ns_per_call', 'mib_per_s', 'cycles_per_byte']
+
+
+_main_head = r"""
+#define _POSIX_C_SOURCE 199309L
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <time.h>
+#if defined(__x86_64__) || defined(__i386__)
+#include <x86intrin.h>
+#define ticks() __rdtsc()
+#else
+#define ticks() 0
+#endif
+"""
+
+_main_run = r"""
+static uint64_t run_{name}(const unsigned char *buf, size_t len, unsigned long iterations)
+{{
+    crc_{name}_t crc = crc_{name}_init();
+    unsigned long i;
+
+    for (i = 0; i < iterations; i++) {{
+        crc = crc_{name}_update(crc, buf, len);
+    }}
+    return crc_{name}_finalize(crc);
+}}
+"""
+
+_main_body = r"""
+static double now(void)
+{
+    struct timespec ts;
+
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec + ts.tv_nsec * 1e-9;
+}
+
+volatile uint64_t sink;
+
+/* usage: bench MIN_TIME REPEAT SIZE... */
+int main(int argc, char *argv[])
+{
+    double min_time = atof(argv[1]);
+    int repeat = atoi(argv[2]);
+    size_t max_size = 9;
+    unsigned char *buf;
+    size_t i, v;
+    int a, r;
+
+    for (a = 3; a < argc; a++) {
+        if ((size_t)atol(argv[a]) > max_size) {
+            max_size = (size_t)atol(argv[a]);
+        }
+    }
+    buf = malloc(max_size);
+    if (buf == NULL) {
+        return 1;
+    }
+    for (i = 0; i < max_size; i++) {
+        buf[i] = (unsigned char)rand();
+    }
+    for (v = 0; v < sizeof(variants) / sizeof(variants[0]); v++) {
+        printf("check %s %llx\n", variants[v].name,
+                (unsigned long long)variants[v].run((const unsigned char *)"123456789", 9, 1));
+        for (a = 3; a < argc; a++) {
+            size_t size = (size_t)atol(argv[a]);
+            unsigned long iterations = 1;
+            double start;
+
+            /* calibrate the number of iterations of one measurement */
+            for (;;) {
+                start = now();
+                sink += variants[v].run(buf, size, iterations);
+                if (now() - start >= min_time) {
+                    break;
+                }
+                iterations *= 2;
+            }
+            for (r = 0; r < repeat; r++) {
+                uint64_t t0 = ticks();
+                start = now();
+                sink += variants[v].run(buf, size, iterations);
+                printf("time %s %lu %lu %.0f %llu\n", variants[v].name, (unsigned long)size, iterations,
+                        (now() - start) * 1e9, (unsigned long long)(ticks() - t0));
+            }
+        }
+        fflush(stdout);
+    }
+    free(buf);
+    return 0;
+}
+"""
+
+
+class Options(object):
+    """
+    The options parsing and validating class
+    """
+
+    def __init__(self):
+        self.models = ['crc-8', 'crc-16', 'xmodem', 'crc-24', 'crc-32', 'crc-32-mpeg', 'crc-64-xz']
+        self.variants = [v[0] for v in variants]
+        self.sizes = [64, 1024, 16 * 1024, 1024 * 1024]
+        self.repeat = 7
+        self.min_time = 0.02
+        self.cc = os.environ.get('CC', 'cc')
+        self.cflags = shlex.split(os.environ.get('CFLAGS', '-W -Wall -O3 -march=native'))
+        self.cpu_mhz = None
+        self.output_file = None
+        self.verbose = False
+
+    def parse(self, argv = None):
+        """
+        Parses and validates the options given as arguments
+        """
+        usage = """%prog [OPTIONS]
+
+Generate, compile and time the C code of pycrc for a set of models, algorithms
+and buffer sizes.  The compiler and its flags are taken from the CC and CFLAGS
+environment variables unless they are given as options."""
+
+        parser = OptionParser(usage=usage)
+        parser.add_option('-v', '--verbose',
+                        action='store_true', dest='verbose', default=self.verbose,
+                        help='print the compiler commands')
+        parser.add_option('--model',
+                        action='append', type='string', dest='models',
+                        help='benchmark MODEL; can be given more than once (default: {0:s})'.format(
+                            ', '.join(self.models)), metavar='MODEL')
+        parser.add_option('--variant',
+                        action='append', type='string', dest='variants',
+                        help='benchmark VARIANT from {{{0:s}}}; can be given more than once (default: all)'.format(
+                            ', '.join(self.variants)), metavar='VARIANT')
+        parser.add_option('--size',
+                        action='append', type='int', dest='sizes',
+                        help='time buffers of SIZE octets; can be given more than once (default: {0:s})'.format(
+                            ', '.join(str(s) for s in self.sizes)), metavar='SIZE')
+        parser.add_option('--repeat',
+                        action='store', type='int', dest='repeat', default=self.repeat,
+                        help='report the median of NUM measurements (default: {0:d})'.format(self.repeat),
+                        metavar='NUM')
+        parser.add_option('--min-time',
+                        action='store', type='float', dest='min_time', default=self.min_time,
+                        help='minimum duration of one measurement in seconds (default: {0:g})'.format(self.min_time),
+                        metavar='SECONDS')
+        parser.add_option('--cc',
+                        action='store', type='string', dest='cc', default=self.cc,
+                        help='the C compiler (default: {0:s})'.format(self.cc), metavar='CC')
+        parser.add_option('--cflags',
+                        action='store', type='string', dest='cflags', default=None,
+                        help='the flags of the C compiler (default: {0:s})'.format(' '.join(self.cflags)),
+                        metavar='CFLAGS')
+        parser.add_option('--cpu-mhz',
+                        action='store', type='float', dest='cpu_mhz', default=None,
+                        help='calculate the cycles per byte from the time and the clock frequency MHZ '
+                            'instead of the time stamp counter of x86 CPUs', metavar='MHZ')
+        parser.add_option('-o', '--output',
+                        action='store', type='string', dest='output_file', default=None,
+                        help='write the results as CSV table to FILE', metavar='FILE')
+
+        (options, args) = parser.parse_args(argv)
+        if len(args) != 0:
+            parser.error('unrecognized argument(s): {0:s}'.format(' '.join(args)))
+
+        self.verbose = options.verbose
+        if options.models is not None:
+            self.models = options.models
+        for model in self.models:
+            if CrcModels().get_params(model) is None:
+                parser.error('unknown model: {0:s}'.format(model))
+        if options.variants is not None:
+            self.variants = options.variants
+        for variant in self.variants:
+            if variant not in [v[0] for v in variants]:
+                parser.error('unknown variant: {0:s}'.format(variant))
+        if options.sizes is not None:
+            self.sizes = options.sizes
+        if min(self.sizes) < 1:
+            parser.error('the buffer size must be at least 1')
+        if options.repeat < 1:
+            parser.error('the number of repetitions must be at least 1')
+        self.repeat = options.repeat
+        self.min_time = options.min_time
+        self.cc = options.cc
+        if options.cflags is not None:
+            self.cflags = shlex.split(options.cflags)
+        self.cpu_mhz = options.cpu_mhz
+        self.output_file = options.output_file
+
+
+def _median(values):
+    """
+    Return the median of a list of numbers.
+    """
+    values = sorted(values)
+    mid = len(values) // 2
+    if len(values) % 2:
+        return values[mid]
+    return (values[mid - 1] + values[mid]) / 2.0
+
+
+def _generate(model, variant, action, filename):
+    """
+    Generate the C header or source file of a variant for a model with the
+    symbol prefix crc_<variant name>_.  Return None if the code generator does
+    not support the variant for the model.
+    """
+    name, algorithm, table_idx_width, slice_by, streams = variant
+    argv = ['--model', model, '--algorithm', algorithm, '--std', 'C99',
+            '--symbol-prefix', 'crc_{0:s}_'.format(name), '--generate', action, '-o', filename]
+    if table_idx_width is not None:
+        argv += ['--table-idx-width', str(table_idx_width)]
+    if slice_by is not None:
+        argv += ['--slice-by', str(slice_by)]
+    if streams is not None:
+        argv += ['--streams', str(streams)]
+    opt = PycrcOptions(progname, version, url)
+    opt.parse(argv)
+    if slice_by is not None and opt.slice_by != slice_by:
+        return None
+    return str(cg.File(opt, ''))
+
+
+def build(model, model_variants, opt, build_dir):
+    """
+    Generate the code of the variants for a model and compile the benchmark
+    program.  Return the file name of the program and the list of the
+    variants it contains, or None if the compilation failed.
+    """
+    sources = []
+    built = []
+    for variant in model_variants:
+        base = os.path.join(build_dir, 'crc_{0:s}'.format(variant[0]))
+        header = _generate(model, variant, 'h', base + '.h')
+        if header is None:
+            continue
+        with open(base + '.h', 'w') as f:
+            f.write(header)
+        with open(base + '.c', 'w') as f:
+            f.write(_generate(model, variant, 'c', base + '.c'))
+        sources.append(base + '.c')
+        built.append(variant)
+
+    main_src = os.path.join(build_dir, 'performance.c')
+    with open(main_src, 'w') as f:
+        f.write(_main_head)
+        for variant in built:
+            f.write('#include "crc_{0:s}.h"\n'.format(variant[0]))
+        for variant in built:
+            f.write(_main_run.format(name=variant[0]))
+        f.write('\nstatic const struct {\n    const char *name;\n'
+                '    uint64_t (*run)(const unsigned char *buf, size_t len, unsigned long iterations);\n'
+                '} variants[] = {\n')
+        for variant in built:
+            f.write('    {{"{0:s}", run_{0:s}}},\n'.format(variant[0]))
+        f.write('};\n')
+        f.write(_main_body)
+
+    program = os.path.join(build_dir, 'performance')
+    cmd = [opt.cc] + opt.cflags + ['-I', build_dir, '-o', program, main_src] + sources
+    if opt.verbose:
+        print(' '.join(cmd))
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    output = proc.communicate()[0]
+    if proc.returncode != 0:
+        sys.stderr.write('error: compiling the code for {0:s} failed:\n{1:s}\n'.format(
+            model, output.decode('utf-8', 'replace')))
+        return None
+    return program, built
+
+
+def run_model(model, opt):
+    """
+    Benchmark all variants for a model and return the list of result rows.
+    """
+    params = CrcModels().get_params(model)
+    model_variants = [v for v in variants if v[0] in opt.variants]
+    build_dir = tempfile.mkdtemp(prefix='pycrc.')
+    try:
+        built = build(model, model_variants, opt, build_dir)
+        if built is None:
+            return None
+        program, built = built
+        cmd = [program, repr(opt.min_time), str(opt.repeat)] + [str(s) for s in opt.sizes]
+        output = subprocess.check_output(cmd).decode('utf-8')
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+    checks = {}
+    measurements = {}
+    for line in output.splitlines():
+        fields = line.split()
+        if fields[0] == 'check':
+            checks[fields[1]] = int(fields[2], 16)
+        elif fields[0] == 'time':
+            key = (fields[1], int(fields[2]))
+            measurements.setdefault(key, []).append((int(fields[3]), float(fields[4]), int(fields[5])))
+
+    rows = []
+    for name, algorithm, table_idx_width, slice_by, streams in built:
+        if checks[name] != params['check']:
+            sys.stderr.write('error: the {0:s} code for {1:s} returns {2:#x} instead of {3:#x}\n'.format(
+                name, model, checks[name], params['check']))
+            return None
+        for size in opt.sizes:
+            samples = measurements[(name, size)]
+            iterations = samples[0][0]
+            ns = _median([s[1] for s in samples])
+            nbytes = float(size * iterations)
+            if opt.cpu_mhz is not None:
+                cycles = ns * opt.cpu_mhz / 1000.0
+            else:
+                cycles = _median([s[2] for s in samples])
+            rows.append({
+                'model': model,
+                'width': params['width'],
+                'reflect_in': params['reflect_in'],
+                'variant': name,
+                'algorithm': algorithm,
+                'table_idx_width': table_idx_width if table_idx_width is not None else '',
+                'slice_by': slice_by if slice_by is not None else '',
+                'streams': streams if streams is not None else '',
+                'size': size,
+                'iterations': iterations,
+                'ns_per_call': round(ns / iterations, 1),
+                'mib_per_s': round(nbytes / (1024 * 1024) / (ns * 1e-9), 3),
+                'cycles_per_byte': round(cycles / nbytes, 3) if cycles else '',
+            })
+    return rows
+
+
+def format_row(row):
+    """
+    Return one line of the table of results.
+    """
+    cpb = row['cycles_per_byte']
+    return '{0:<14s}{1:<9s}{2:>10d}{3:>12.1f}{4:>12s}'.format(
+        row['model'], row['variant'], row['size'], row['mib_per_s'],
+        '{0:.2f}'.format(cpb) if cpb != '' else '-')
+
+
+def main():
+    """
+    Main function.
+    """
+    opt = Options()
+    opt.parse(sys.argv[1:])
+
+    print('{0:<14s}{1:<9s}{2:>10s}{3:>12s}{4:>12s}'.format('model', 'variant', 'size', 'MiB/s', 'cycles/B'))
+    rows = []
+    status = 0
+    for model in opt.models:
+        model_rows = run_model(model, opt)
+        if model_rows is None:
+            status = 1
+            continue
+        for row in model_rows:
+            print(format_row(row))
+        sys.stdout.flush()
+        rows += model_rows
+
+    if opt.output_file is not None:
+        with open(opt.output_file, 'w') as f:
+            writer = csv.DictWriter(f, columns, lineterminator='\n')
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+    return status
+
+
+# program entry point
+if __name__ == '__main__':
+    sys.exit(main())
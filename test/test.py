@@ -6,11 +6,16 @@
 from optparse import OptionParser, Option, OptionValueError
 from copy import copy
 import os, sys
+import shutil
 import tempfile
 sys.path.append('..')
 sys.path.append('.')
 from pycrc.models import CrcModels
-from pycrc.algorithms import Crc
+from pycrc.algorithms import Crc, new, solve_xor
+import pycrc.native as native
+import pycrc.tablestore as tablestore
+import pycrc.benchmark as benchmark
+from pycrc.reveng import identify, search
 
 
 class Options(object):
@@ -186,11 +191,11 @@ class CrcTests(object):
             return None
         return gen_src
 
-    def __compile(self, args, binfile, cstd):
+    def __compile(self, args, binfile, cstd, cflags=''):
         """
         Compile a generated source file.
         """
-        cmd_str = 'gcc -W -Wall -pedantic -Werror -std={0:s} -o {1:s} {2:s}.c'.format(cstd, binfile, binfile)
+        cmd_str = 'gcc -W -Wall -pedantic -Werror -std={0:s} {1:s} -o {2:s} {3:s}.c'.format(cstd, cflags, binfile, binfile)
         if self.verbose:
             print(cmd_str)
         ret = self.__get_status_output(cmd_str)
@@ -201,14 +206,14 @@ class CrcTests(object):
             return None
         return binfile
 
-    def __make_bin(self, args, basename, cstd='c99'):
+    def __make_bin(self, args, basename, cstd='c99', cflags=''):
         """
         Generate the source and compile to a binary.
         """
         filename = self.__make_src(args, basename, cstd)
         if filename is None:
             return None
-        if not self.__compile(args, filename, cstd):
+        if not self.__compile(args, filename, cstd, cflags):
             self.__del_files([filename, filename+'.h', filename+'.c'])
             return None
         return filename
@@ -290,6 +295,17 @@ class CrcTests(object):
         return True
 
 
+    def __model_crc(self, model, **kwargs):
+        """
+        Return a Crc object with the parameters of model.  Further arguments
+        of Crc, or parameters which differ from the model, can be given as
+        keyword arguments.
+        """
+        params = dict((key, model[key]) for key in ['width', 'poly', 'reflect_in', 'xor_in', 'reflect_out', 'xor_out'])
+        params.update(kwargs)
+        return Crc(**params)
+
+
     def __run_command(self, cmd_str):
         """
         Run a command and return its stdout.
@@ -364,6 +380,18 @@ class CrcTests(object):
                 crc = tbl_crc
             error = error or tbl_crc != crc
 
+            for slice_by in [4, 8, 16]:
+                alg_sb = self.__model_crc(model, slice_by = slice_by)
+                sb_crc = alg_sb.table_driven(bytearray(check_str * 5, 'utf-8'))
+                if sb_crc != alg.table_driven(check_str * 5):
+                    print('error: slice-by {0:d}: different checksums!'.format(slice_by))
+                    error = True
+
+            alg_16 = self.__model_crc(model, table_idx_width = 16)
+            if alg_16.table_driven(check_str * 5) != alg.table_driven(check_str * 5):
+                print('error: table-idx-width 16: different checksums!')
+                error = True
+
         if error:
             print('error: different checksums!')
             if expected_crc is not None:
@@ -377,11 +405,11 @@ class CrcTests(object):
             return None
         return crc
 
-    def __compile_and_check_res(self, cmp_opt, run_opt, name, expected_crc):
+    def __compile_and_check_res(self, cmp_opt, run_opt, name, expected_crc, cflags=''):
         """
         Compile a model and run it.
         """
-        filename = self.__make_bin(cmp_opt, name)
+        filename = self.__make_bin(cmp_opt, name, cflags=cflags)
         if filename is None:
             return False
         if run_opt is None:
@@ -395,6 +423,78 @@ class CrcTests(object):
         return True
 
 
+    def __long_message(self, length, offset):
+        """
+        Return the message of the C program of __check_long_messages().
+        """
+        data = bytearray(((i * 251) + (i >> 8)) & 0xff for i in range(offset + length))
+        return data[offset:]
+
+    def __check_long_messages(self, cmp_opt, name, cases, cflags='', update_function='crc_update'):
+        """
+        Compile the generated code with a program that calculates the CRC of
+        a generated message of a given length at a given offset from an
+        aligned buffer, and compare the results with the Python table-driven
+        algorithm.  This covers messages longer than a command line argument.
+        The message is passed to update_function.
+        """
+        gen_src = '{0:s}/{1:s}'.format(self.tmpdir, name)
+        for gen, ext in [('h', '.h'), ('c', '.c')]:
+            cmd_str = self.pycrc_bin + ' {0:s} --generate {1:s} -o {2:s}{3:s}'.format(cmp_opt, gen, gen_src, ext)
+            ret = self.__get_status_output(cmd_str)
+            if ret[0] != 0:
+                print('error: the following command returned error: {0:s}'.format(cmd_str))
+                print(ret[1])
+                return False
+        f = open(gen_src + '_main.c', 'w')
+        f.write(('#include "{0:s}.h"\n'
+                '#include <stdio.h>\n'
+                '#include <stdlib.h>\n'
+                '\n'
+                'int main(int argc, char *argv[])\n'
+                '{{\n'
+                '    size_t length, offset, i;\n'
+                '    unsigned char *buf;\n'
+                '    crc_t crc;\n'
+                '\n'
+                '    if (argc != 3) {{\n'
+                '        return 1;\n'
+                '    }}\n'
+                '    length = strtoul(argv[1], NULL, 10);\n'
+                '    offset = strtoul(argv[2], NULL, 10);\n'
+                '    buf = malloc(offset + length + 1);\n'
+                '    for (i = 0; i < offset + length; i++) {{\n'
+                '        buf[i] = (unsigned char)((i * 251) + (i >> 8));\n'
+                '    }}\n'
+                '    crc = crc_init();\n'
+                '    crc = {1:s}(crc, buf + offset, length);\n'
+                '    crc = crc_finalize(crc);\n'
+                '    printf("0x%llx\\n", (unsigned long long int)crc);\n'
+                '    free(buf);\n'
+                '    return 0;\n'
+                '}}\n').format(name, update_function))
+        f.close()
+        files = [gen_src, gen_src + '.h', gen_src + '.c', gen_src + '_main.c']
+        cmd_str = 'gcc -W -Wall -pedantic -Werror -std=c99 {0:s} -o {1:s} {1:s}.c {1:s}_main.c'.format(cflags, gen_src)
+        ret = self.__get_status_output(cmd_str)
+        if ret[0] != 0:
+            print('error: {0:d} with command error: {1:s}'.format(ret[0], cmd_str))
+            print(ret[1])
+            self.__del_files(files[1:])
+            return False
+        opt = cmp_opt.split()
+        m = CrcModels().get_params(opt[opt.index('--model') + 1])
+        alg = self.__model_crc(m)
+        ret = True
+        for length, offset in cases:
+            expected_crc = alg.table_driven(self.__long_message(length, offset))
+            if not self.__check_command('{0:s} {1:d} {2:d}'.format(gen_src, length, offset), expected_crc):
+                ret = False
+                break
+        self.__del_files(files)
+        return ret
+
+
     def __test_models(self):
         """
         Standard Tests.
@@ -436,6 +536,330 @@ class CrcTests(object):
         return True
 
 
+    def __test_model_registry(self):
+        """
+        Test the indices of the model registry.
+        """
+        if self.verbose:
+            print('Running __test_model_registry()...')
+        models = CrcModels()
+        for m in models.models:
+            if models.get_params(m['name'].upper()) != m:
+                print('error: get_params({0:s}) failed'.format(m['name'].upper()))
+                return False
+            names = models.names_by_params(m['width'], m['poly'], m['reflect_in'], m['xor_in'], m['reflect_out'], m['xor_out'])
+            if m['name'] not in names or m['name'] not in models.names_by_check(m['width'], m['check']):
+                print('error: model {0:s} not found by its parameters or its check value'.format(m['name']))
+                return False
+        try:
+            models.models[0]['poly'] = 0
+        except TypeError:
+            pass
+        else:
+            print('error: the model registry can be modified')
+            return False
+        return True
+
+
+    def __test_identify(self):
+        """
+        Test the identification of the known models from their check value.
+        """
+        if self.verbose:
+            print('Running __test_identify()...')
+        check_bytes = bytearray('123456789', 'utf-8')
+        models = CrcModels()
+        for m in models.models:
+            num_bytes = (m['width'] + 7) // 8
+            sample = check_bytes + bytearray((m['check'] >> (8 * (num_bytes - 1 - i))) & 0xff for i in range(num_bytes))
+            matches = identify([sample, sample[:2] + sample[-num_bytes:]])
+            if (m['name'], 'big') in matches:
+                print('error: identify() matched {0:s} with an invalid sample'.format(m['name']))
+                return False
+            if (m['name'], 'big') not in identify([sample]):
+                print('error: identify() did not find {0:s}'.format(m['name']))
+                return False
+        return True
+
+
+    def __test_search(self):
+        """
+        Test the search of the CRC parameters from sample messages.
+        """
+        if self.verbose:
+            print('Running __test_search()...')
+        messages = ['123456789', 'abcdefghi', 'ABCDEFGHI', 'pycrc 0.9', 'Lorem ips', 'pycrc', 'Lorem ipsum']
+        models = CrcModels()
+        for m in models.models:
+            alg = self.__model_crc(m)
+            samples = [(bytearray(msg, 'utf-8'), alg.table_driven(msg)) for msg in messages]
+            found = [p for p in search(samples, m['width'])
+                    if all(p[k] == m[k] for k in m if k != 'name')]
+            if len(found) != 1 or found[0]['name'] not in models.names_by_params(
+                    m['width'], m['poly'], m['reflect_in'], m['xor_in'], m['reflect_out'], m['xor_out']):
+                print('error: search() did not find {0:s}'.format(m['name']))
+                return False
+        return True
+
+
+    def __test_solve_xor(self):
+        """
+        Test the calculation of xor_in and xor_out from sample messages.
+        """
+        if self.verbose:
+            print('Running __test_solve_xor()...')
+        messages = ['123456789', 'pycrc', 'Lorem ipsum']
+        models = CrcModels()
+        for m in models.models:
+            alg = self.__model_crc(m)
+            samples = [(bytearray(msg, 'utf-8'), alg.table_driven(msg)) for msg in messages]
+            found = solve_xor(m['width'], m['poly'], m['reflect_in'], m['reflect_out'], samples)
+            if (m['xor_in'], m['xor_out']) not in found:
+                print('error: solve_xor() did not find the xor values of {0:s}'.format(m['name']))
+                return False
+            samples[-1] = (samples[-1][0], samples[-1][1] ^ 1)
+            if (m['xor_in'], m['xor_out']) in solve_xor(m['width'], m['poly'], m['reflect_in'], m['reflect_out'], samples):
+                print('error: solve_xor() found the xor values of {0:s} with an invalid sample'.format(m['name']))
+                return False
+        return True
+
+
+    def __test_crc_hash(self):
+        """
+        Test the incremental CrcHash interface against the known models.
+        """
+        if self.verbose:
+            print('Running __test_crc_hash()...')
+        models = CrcModels()
+        for m in models.models:
+            crc = new(m['name'])
+            crc.update('1234')
+            fork = crc.copy()
+            crc.update(bytearray(b'56789'))
+            if crc.intdigest() != m['check']:
+                print('error: CrcHash({0:s}) returned {1:s}, expected {2:#x}'.format(m['name'], crc.hexdigest(), m['check']))
+                return False
+            if int(crc.hexdigest(), 16) != m['check'] or len(crc.digest()) != crc.digest_size:
+                print('error: CrcHash({0:s}) returned an inconsistent digest'.format(m['name']))
+                return False
+            fork.update('56789')
+            if fork.intdigest() != m['check']:
+                print('error: copy of CrcHash({0:s}) returned {1:s}'.format(m['name'], fork.hexdigest()))
+                return False
+            long_bytes = bytearray(range(256)) * 5
+            alg = self.__model_crc(m, backend = 'python')
+            if new(m['name'], long_bytes).intdigest() != alg.new(long_bytes).intdigest():
+                print('error: CrcHash({0:s}) with backend {1:s} differs from the python backend'.format(m['name'], crc.crc.get_backend().name))
+                return False
+        return True
+
+
+    def __test_table_driven_batch(self):
+        """
+        Test the batched table-driven algorithm against the known models.
+        """
+        if self.verbose:
+            print('Running __test_table_driven_batch()...')
+        messages = ['123456789', '', '1', '123456789', '12345678901234567890']
+        models = CrcModels()
+        for m in models.models:
+            alg = self.__model_crc(m)
+            expected = [alg.table_driven(msg) for msg in messages]
+            result = [int(crc) for crc in alg.table_driven_batch(messages)]
+            if result != expected or result[0] != m['check']:
+                print('error: table_driven_batch({0:s}) returned {1}, expected {2}'.format(m['name'], result, expected))
+                return False
+        return True
+
+
+    def __test_combine(self):
+        """
+        Test Crc.combine() and Crc.extend_zeros() against the known models.
+        """
+        if self.verbose:
+            print('Running __test_combine()...')
+        check_bytes = bytearray('123456789', 'utf-8')
+        models = CrcModels()
+        for m in models.models:
+            alg = self.__model_crc(m)
+            for i in range(len(check_bytes) + 1):
+                crc_a = alg.table_driven(check_bytes[:i])
+                crc_b = alg.table_driven(check_bytes[i:])
+                crc = alg.combine(crc_a, crc_b, len(check_bytes) - i)
+                if crc != m['check']:
+                    print('error: combine({0:s}) at offset {1:d} returned {2:#x}, expected {3:#x}'.format(m['name'], i, crc, m['check']))
+                    return False
+            for length in [0, 1, 5, 1000]:
+                crc = alg.extend_zeros(m['check'], length)
+                expected = alg.table_driven(check_bytes + bytearray(length))
+                if crc != expected:
+                    print('error: extend_zeros({0:s}, {1:d}) returned {2:#x}, expected {3:#x}'.format(m['name'], length, crc, expected))
+                    return False
+        return True
+
+
+    def __test_native_backend(self):
+        """
+        Test the compiled native backend against the known models.
+        """
+        if self.verbose:
+            print('Running __test_native_backend()...')
+        check_bytes = bytearray('123456789', 'utf-8')
+        native_dir = '{0:s}/native'.format(self.tmpdir)
+        models = CrcModels()
+        try:
+            for m in models.models:
+                alg = self.__model_crc(m)
+                backend = native.load(alg, native_dir)
+                if backend is None:
+                    print('error: native backend for {0:s} cannot be compiled'.format(m['name']))
+                    return False
+                reg = backend.update(backend.init(), check_bytes[:4])
+                crc = backend.finalize(backend.update(reg, bytes(check_bytes[4:])))
+                if crc != m['check']:
+                    print('error: native backend for {0:s} returned {1:#x}, expected {2:#x}'.format(m['name'], crc, m['check']))
+                    return False
+        finally:
+            shutil.rmtree(native_dir, ignore_errors=True)
+        return True
+
+
+    def __test_table_store(self):
+        """
+        Test the store of prebuilt tables against the tables of the known models.
+        """
+        if self.verbose:
+            print('Running __test_table_store()...')
+        filename = '{0:s}/models.tbl'.format(self.tmpdir)
+        tablestore.build_model_store(filename)
+        try:
+            for m in CrcModels().models:
+                alg = self.__model_crc(m, table_idx_width = 8, slice_by = 8)
+                tbl = tablestore.read_table(filename, m['width'], m['poly'], m['reflect_in'], 8, 8)
+                if tbl != alg.gen_table():
+                    print('error: the stored tables of {0:s} differ from gen_table()'.format(m['name']))
+                    return False
+        finally:
+            os.remove(filename)
+
+        # The cache directory is only used if it has a size, and keeps the
+        # tables of each slice-by parameter.
+        cache_dir = '{0:s}/cache'.format(self.tmpdir)
+        old_cache_dir = os.environ.get('PYCRC_CACHE_DIR')
+        os.environ['PYCRC_CACHE_DIR'] = cache_dir
+        try:
+            alg = Crc(width = 24, poly = 0x5d6dcb, reflect_in = False, xor_in = 0,
+                    reflect_out = False, xor_out = 0, table_idx_width = 8, slice_by = 16)
+            tbl16 = alg.gen_table()
+            tablestore.save(24, 0x5d6dcb, False, 8, tbl16)
+            if os.path.exists(cache_dir):
+                print('error: the table store wrote to the cache directory without a cache size')
+                return False
+            tablestore.set_cache_size(1024 * 1024)
+            tablestore.save(24, 0x5d6dcb, False, 8, tbl16)
+            tablestore.save(24, 0x5d6dcb, False, 8, tbl16[:4])
+            for slice_by in [1, 4, 8, 16]:
+                if tablestore.load(24, 0x5d6dcb, False, 8, slice_by) != tbl16[:slice_by]:
+                    print('error: the cached tables for slice-by {0:d} differ'.format(slice_by))
+                    return False
+        finally:
+            tablestore.set_cache_size(0)
+            if old_cache_dir is None:
+                del os.environ['PYCRC_CACHE_DIR']
+            else:
+                os.environ['PYCRC_CACHE_DIR'] = old_cache_dir
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        return True
+
+
+    def __test_benchmark(self):
+        """
+        Test the benchmark report and the comparison with a baseline.
+        """
+        if self.verbose:
+            print('Running __test_benchmark()...')
+        report = benchmark.run(models=['crc-16', 'crc-32'], sizes=[16, 64],
+                algorithms=['bit-by-bit', 'table-driven', 'binascii'], min_time=0.001)
+        if len(report['results']) != 10:
+            print('error: the benchmark report has {0:d} instead of 10 results'.format(len(report['results'])))
+            return False
+        filename = '{0:s}/benchmark.json'.format(self.tmpdir)
+        benchmark.write_report(filename, report)
+        try:
+            baseline = benchmark.read_report(filename)
+        finally:
+            os.remove(filename)
+        if baseline != report or benchmark.compare(baseline, report) != []:
+            print('error: the benchmark report differs from its JSON file')
+            return False
+        for r in baseline['results']:
+            r['mib_per_s'] *= 2
+        if len(benchmark.compare(baseline, report)) != len(report['results']):
+            print('error: the benchmark regressions were not detected')
+            return False
+        return True
+
+
+    def __test_check_file(self):
+        """
+        Compare the checksum of a file with the checksum of the same data
+        given with --check-string, for all known models and algorithms.
+        """
+        if self.verbose:
+            print('Running __test_check_file()...')
+        check_str = 'The quick brown fox jumps over the lazy dog 0123456789 ' * 20
+        filename = '{0:s}/check_file.txt'.format(self.tmpdir)
+        f = open(filename, 'wb')
+        f.write(bytearray(check_str, 'utf-8'))
+        f.close()
+        algorithms = []
+        if self.use_algo_bit_by_bit:
+            algorithms.append('bit-by-bit')
+        if self.use_algo_bit_by_bit_fast:
+            algorithms.append('bit-by-bit-fast')
+        if self.use_algo_table_driven:
+            algorithms.append('table-driven')
+        ret = True
+        models = CrcModels()
+        for m in models.models:
+            cmd_str = '{0:s} --model {1:s} --check-string "{2:s}"'.format(self.pycrc_bin, m['name'], check_str)
+            crc = self.__run_command(cmd_str)
+            if crc is None:
+                ret = False
+                break
+            for algo in algorithms:
+                cmd_str = '{0:s} --model {1:s} --algorithm {2:s} --check-file {3:s}'.format(self.pycrc_bin, m['name'], algo, filename)
+                if not self.__check_command(cmd_str, int(crc, 16)):
+                    ret = False
+                    break
+            if not ret:
+                break
+        os.remove(filename)
+        return ret
+
+
+    def __test_check_file_jobs(self):
+        """
+        Test the parallel calculation of the checksum of a file.
+        """
+        if self.verbose:
+            print('Running __test_check_file_jobs()...')
+        filename = '{0:s}/check_jobs.bin'.format(self.tmpdir)
+        f = open(filename, 'wb')
+        f.write(bytearray([(i * 7 + (i >> 8)) & 0xff for i in range(10007)]))
+        f.close()
+        ret = True
+        models = CrcModels()
+        for m in models.models:
+            cmd_str = '{0:s} --model {1:s} --check-file {2:s}'.format(self.pycrc_bin, m['name'], filename)
+            crc = self.__run_command(cmd_str)
+            if crc is None or not self.__check_command(cmd_str + ' --jobs 3', int(crc, 16)):
+                ret = False
+                break
+        os.remove(filename)
+        return ret
+
+
     def __test_compiled_models(self):
         """
         Standard Tests.
@@ -477,6 +901,206 @@ class CrcTests(object):
         return True
 
 
+    def __test_compiled_slice_by(self):
+        """
+        Test the slice-by algorithm of the compiled code for all known models
+        with a string which is long enough to run the main loop of all
+        slice-by variants several times.
+        """
+        if self.verbose:
+            print('Running __test_compiled_slice_by()...')
+        check_str = 'TheQuickBrownFoxJumpsOverTheLazyDog0123456789' * 3
+        models = CrcModels()
+        for m in models.models:
+            alg = self.__model_crc(m)
+            expected_crc = alg.bit_by_bit_fast(check_str)
+            for slice_by in [4, 8, 16]:
+                cmp_opt = '--model {0:s} --algorithm table-driven --slice-by={1:d}'.format(m['name'], slice_by)
+                if not self.__compile_and_check_res(cmp_opt, '-s ' + check_str, 'crc_tsb_long', expected_crc):
+                    return False
+
+        # Non-reflected models wider than 32 bits, which are not in the catalogue.
+        for width, poly, xor_in, xor_out in [
+                (33, 0x0000000a7, 0x000000000, 0x1ffffffff),
+                (40, 0x0004820009, 0x0000000000, 0xffffffffff),
+                (63, 0x0000000000000003, 0x7fffffffffffffff, 0x0000000000000000),
+                (64, 0x42f0e1eba9ea3693, 0xffffffffffffffff, 0xffffffffffffffff)]:
+            alg = Crc(width = width, poly = poly,
+                    reflect_in = False, xor_in = xor_in,
+                    reflect_out = False, xor_out = xor_out)
+            expected_crc = alg.bit_by_bit_fast(check_str)
+            for slice_by in [4, 8, 16]:
+                cmp_opt = '--width={0:d} --poly={1:#x} --reflect-in=0 --xor-in={2:#x} --reflect-out=0 --xor-out={3:#x} ' \
+                        '--algorithm table-driven --slice-by={4:d}'.format(width, poly, xor_in, xor_out, slice_by)
+                if not self.__compile_and_check_res(cmp_opt, '-s ' + check_str, 'crc_tsb_long', expected_crc):
+                    return False
+        return True
+
+
+    def __test_compiled_clmul(self):
+        """
+        Test the clmul algorithm of the compiled code for all known models and
+        their counterparts with the opposite reflection, with strings of
+        lengths around the block sizes.  The test is skipped if the host has
+        no PCLMULQDQ instruction.
+        """
+        try:
+            with open('/proc/cpuinfo') as f:
+                if 'pclmulqdq' not in f.read():
+                    return True
+        except IOError:
+            return True
+        if self.verbose:
+            print('Running __test_compiled_clmul()...')
+        long_str = 'TheQuickBrownFoxJumpsOverTheLazyDog0123456789' * 5
+        models = CrcModels()
+        for m in models.models:
+            for reflect in [m['reflect_in'], not m['reflect_in']]:
+                cmp_opt = '--model {0:s} --reflect-in {1:d} --reflect-out {1:d} --algorithm clmul'.format(m['name'], reflect)
+                filename = self.__make_bin(cmp_opt, 'crc_clmul', cflags='-msse4.1 -mpclmul')
+                if filename is None:
+                    return False
+                alg = self.__model_crc(m, reflect_in = reflect, reflect_out = reflect)
+                for length in [15, 64, 65, 127, 128, 200]:
+                    check_str = long_str[:length]
+                    ret = self.__check_command(filename + ' -s ' + check_str, alg.bit_by_bit_fast(check_str))
+                    if not ret:
+                        break
+                self.__del_files([filename, filename+'.h', filename+'.c'])
+                if not ret:
+                    return False
+        return True
+
+
+    def __test_compiled_crc32_instruction(self):
+        """
+        Test the crc-32c code, which uses the crc32 instruction of SSE4.2 on
+        x86-64 hosts which support it, with messages long enough for the
+        interleaved streams.
+        """
+        if self.verbose:
+            print('Running __test_compiled_crc32_instruction()...')
+        cases = [(0, 0), (7, 3), (100, 1), (3 * 256, 0), (3 * 256 + 13, 5),
+                (3 * 8192 + 2 * 3 * 256 + 29, 0), (2 * 3 * 8192 + 1000, 7)]
+        return self.__check_long_messages('--model crc-32c --algorithm table-driven', 'crc_crc32c', cases)
+
+
+    def __test_compiled_streams(self):
+        """
+        Test the interleaved streams of the compiled code for all known
+        models, with and without slice-by.
+        """
+        if self.verbose:
+            print('Running __test_compiled_streams()...')
+        cases = [(0, 0), (100, 1), (2 * 256, 0), (3 * 256 + 1, 2), (2 * 4 * 256 + 37, 3)]
+        models = CrcModels()
+        for m in models.models:
+            for args in ['--streams 2', '--streams 3 --slice-by 8', '--streams 4 --slice-by 16']:
+                if '--slice-by' in args and m['width'] < 8:
+                    continue
+                cmp_opt = '--model {0:s} --algorithm table-driven {1:s}'.format(m['name'], args)
+                if not self.__check_long_messages(cmp_opt, 'crc_streams', cases):
+                    return False
+        return True
+
+
+    def __test_compiled_combine(self):
+        """
+        Test the generated shift_zeros and combine functions for all known
+        models: the CRC of a message is calculated from the CRCs of two
+        parts, and extended with zero bytes.
+        """
+        if self.verbose:
+            print('Running __test_compiled_combine()...')
+        cases = [(0, 0, 0), (5, 0, 1), (9, 4, 3), (100, 37, 256), (1000, 999, 1000003), (300, 150, 1 << 40)]
+        gen_src = '{0:s}/crc_combine'.format(self.tmpdir)
+        files = [gen_src, gen_src + '.h', gen_src + '.c', gen_src + '_main.c']
+        models = CrcModels()
+        for m in models.models:
+            alg = self.__model_crc(m)
+            for algo in ['table-driven', 'bit-by-bit-fast']:
+                for gen, ext in [('h', '.h'), ('c', '.c')]:
+                    cmd_str = self.pycrc_bin + ' --model {0:s} --algorithm {1:s} --combine --generate {2:s} -o {3:s}{4:s}'.format(
+                            m['name'], algo, gen, gen_src, ext)
+                    ret = self.__get_status_output(cmd_str)
+                    if ret[0] != 0:
+                        print('error: the following command returned error: {0:s}'.format(cmd_str))
+                        print(ret[1])
+                        return False
+                f = open(gen_src + '_main.c', 'w')
+                f.write('#include "crc_combine.h"\n'
+                        '#include <stdio.h>\n'
+                        '#include <stdlib.h>\n'
+                        '\n'
+                        'int main(int argc, char *argv[])\n'
+                        '{\n'
+                        '    size_t length, split, zeros, i;\n'
+                        '    unsigned char *buf;\n'
+                        '    crc_t crc1, crc2, crc;\n'
+                        '\n'
+                        '    if (argc != 4) {\n'
+                        '        return 1;\n'
+                        '    }\n'
+                        '    length = strtoul(argv[1], NULL, 10);\n'
+                        '    split = strtoul(argv[2], NULL, 10);\n'
+                        '    zeros = strtoull(argv[3], NULL, 10);\n'
+                        '    buf = malloc(length + 1);\n'
+                        '    for (i = 0; i < length; i++) {\n'
+                        '        buf[i] = (unsigned char)((i * 251) + (i >> 8));\n'
+                        '    }\n'
+                        '    crc1 = crc_finalize(crc_update(crc_init(), buf, split));\n'
+                        '    crc2 = crc_finalize(crc_update(crc_init(), buf + split, length - split));\n'
+                        '    crc = crc_shift_zeros(crc_combine(crc1, crc2, length - split), zeros);\n'
+                        '    printf("0x%llx\\n", (unsigned long long int)crc);\n'
+                        '    free(buf);\n'
+                        '    return 0;\n'
+                        '}\n')
+                f.close()
+                cmd_str = 'gcc -W -Wall -pedantic -Werror -std=c99 -o {0:s} {0:s}.c {0:s}_main.c'.format(gen_src)
+                ret = self.__get_status_output(cmd_str)
+                if ret[0] != 0:
+                    print('error: {0:d} with command error: {1:s}'.format(ret[0], cmd_str))
+                    print(ret[1])
+                    self.__del_files(files[1:])
+                    return False
+                for length, split, zeros in cases:
+                    expected_crc = alg.extend_zeros(alg.table_driven(self.__long_message(length, 0)), zeros)
+                    if not self.__check_command('{0:s} {1:d} {2:d} {3:d}'.format(gen_src, length, split, zeros), expected_crc):
+                        self.__del_files(files)
+                        return False
+                self.__del_files(files)
+        return True
+
+
+    def __test_compiled_dispatch(self):
+        """
+        Test the code of the dispatch mode: the update function, which
+        calls the variant selected for the host, and all variants which the
+        host supports.
+        """
+        if self.verbose:
+            print('Running __test_compiled_dispatch()...')
+        try:
+            with open('/proc/cpuinfo') as f:
+                cpu_flags = f.read()
+        except IOError:
+            cpu_flags = ''
+        cases = [(0, 0), (15, 1), (64, 0), (100, 3), (1000, 5), (3 * 8192 + 2 * 3 * 256 + 29, 0)]
+        for model in ['crc-5', 'crc-16', 'xmodem', 'crc-32', 'crc-32c', 'crc-64', 'crc-64-xz']:
+            functions = ['crc_update', 'crc_update_table']
+            if CrcModels().get_params(model)['width'] >= 8:
+                functions.append('crc_update_slice_by_8')
+            if 'pclmulqdq' in cpu_flags and 'sse4_1' in cpu_flags:
+                functions.append('crc_update_clmul')
+            if model == 'crc-32c' and 'sse4_2' in cpu_flags:
+                functions.append('crc_update_sse42')
+            for function in functions:
+                if not self.__check_long_messages('--model {0:s} --algorithm dispatch'.format(model),
+                        'crc_dispatch', cases, update_function=function):
+                    return False
+        return True
+
+
     def __test_compiled_special_cases(self):
         """
         Standard Tests.
@@ -642,12 +1266,66 @@ class CrcTests(object):
         if not self.__test_models():
             return False
 
+        if not self.__test_model_registry():
+            return False
+
+        if not self.__test_crc_hash():
+            return False
+
+        if not self.__test_identify():
+            return False
+
+        if not self.__test_solve_xor():
+            return False
+
+        if not self.__test_search():
+            return False
+
+        if not self.__test_table_driven_batch():
+            return False
+
+        if not self.__test_combine():
+            return False
+
+        if not self.__test_table_store():
+            return False
+
+        if not self.__test_benchmark():
+            return False
+
+        if not self.__test_check_file():
+            return False
+
+        if not self.__test_check_file_jobs():
+            return False
+
         if opt.Compile and not self.__test_compiled_models():
             return False
 
+        if opt.Compile and not self.__test_compiled_slice_by():
+            return False
+
+        if opt.Compile and not self.__test_compiled_clmul():
+            return False
+
+        if opt.Compile and not self.__test_compiled_crc32_instruction():
+            return False
+
+        if opt.Compile and not self.__test_compiled_streams():
+            return False
+
+        if opt.Compile and not self.__test_compiled_combine():
+            return False
+
+        if opt.Compile and not self.__test_compiled_dispatch():
+            return False
+
         if opt.Compile and not self.__test_compiled_special_cases():
             return False
 
+        if opt.Compile and not self.__test_native_backend():
+            return False
+
         if opt.VariableWidth and not self.__test_variable_width():
             return False
 